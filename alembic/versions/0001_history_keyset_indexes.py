@@ -0,0 +1,32 @@
+"""indeks komposit untuk keyset pagination riwayat
+
+Skema awal dibuat di luar Alembic; revisi pertama ini hanya menambahkan indeks.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY di PostgreSQL agar tabel tidak terkunci; harus di luar transaksi
+    with op.get_context().autocommit_block():
+        op.create_index('ix_matches_user_date_id', 'matches', ['user_id', 'match_date', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_matches_user_mode_date_id', 'matches', ['user_id', 'match_mode', 'match_date', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_histories_hero_match', 'histories', ['hero_id', 'match_id'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_histories_hero_match', table_name='histories', postgresql_concurrently=True)
+        op.drop_index('ix_matches_user_mode_date_id', table_name='matches', postgresql_concurrently=True)
+        op.drop_index('ix_matches_user_date_id', table_name='matches', postgresql_concurrently=True)
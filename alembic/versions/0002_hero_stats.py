@@ -0,0 +1,50 @@
+"""tabel hero_stats: counter menang/kalah/seri per (user, hero, mode)
+
+Setelah upgrade, isi counter dari data yang sudah ada dengan:
+    python -m scripts.rebuild_hero_stats
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Salinan nilai GameModeEnum (nama member, seperti yang disimpan kolom matches.match_mode) saat
+# revisi ini dibuat; migrasi tidak mengimpor model agar hasilnya tidak berubah mengikuti model.
+GAME_MODE_VALUES = ('all_pick', 'turbo_mode', 'captain_mode', 'single_draft')
+# Tipe game_mode sudah ada di PostgreSQL; dialek lain memakai VARCHAR dengan CHECK constraint
+game_mode = sa.Enum(*GAME_MODE_VALUES, name='game_mode', native_enum=False, create_constraint=True).with_variant(
+    postgresql.ENUM(*GAME_MODE_VALUES, name='game_mode', create_type=False), 'postgresql'
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'hero_stats',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('hero_id', sa.Integer(), sa.ForeignKey('heroes.id'), nullable=False),
+        sa.Column('match_mode', game_mode, nullable=False),
+        sa.Column('wins', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('losses', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('draws', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('user_id', 'hero_id', 'match_mode', name='_user_hero_mode_uc'),
+    )
+    op.create_index('ix_hero_stats_id', 'hero_stats', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hero_stats_id', table_name='hero_stats')
+    op.drop_table('hero_stats')
@@ -1,42 +1,94 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+import time
+from typing import AsyncGenerator
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import LRUCache
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.criteria_registry import CriteriaRegistry, criteria_registry
+from app.core.hero_catalog import HeroCatalog, hero_catalog
+from app.core.metrics import timed_phase
+from app.db import profiler
+from app.db.session import open_session
 from app.models import models
-from app.schemas.token import TokenData
+from app.schemas.token import Principal, TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/authentication")
 
-def get_db() -> Generator:
+async def get_db(request: Request) -> AsyncGenerator:
+    # AsyncSession asli jika DB_ASYNC aktif, selain itu Session sync dengan antarmuka async
+    db = open_session()
+    # Profil query disimpan di request.state agar middleware bisa menulis header X-DB-*
+    profile_token = profiler.start_profile()
+    if profile_token is not None:
+        request.state.db_profile = profiler.current_profile()
     try:
-        db = SessionLocal()
         yield db
     finally:
-        db.close()
+        await db.close()
+        profiler.stop_profile(profile_token)
+
+# Cache token terverifikasi: {signature JWT: Principal}.
+# Jika user dinonaktifkan atau dihapus langsung di database, panggil POST /internal/users/{id}/invalidate-tokens;
+# tanpa itu token user tersebut tetap diterima paling lama TOKEN_CACHE_TTL_SECONDS (default 5 menit).
+token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: int) -> None:
+    """
+    Buang semua token ter-cache milik user, misalnya setelah user diubah atau dihapus.
+    """
+    token_cache.discard_where(lambda principal: principal.id == user_id)
+
+async def get_current_principal(
+    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    Identitas user dari token. Token yang sudah diverifikasi di-cache berdasarkan
+    signature-nya, sehingga request berikutnya tidak menyentuh database.
+    """
+    signature = token.rsplit(".", 1)[-1]
+    principal = token_cache.get(signature)
+    if principal is not None:
+        return principal
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> models.Users:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        with timed_phase("jwt_decode"):
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = db.query(models.Users).filter(models.Users.username == token_data.username).first()
+    user = await db.scalar(select(models.Users).where(models.Users.username == token_data.username))
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+
+    principal = Principal(id=user.id, username=user.username)
+    # Entri cache tidak boleh hidup lebih lama dari token itu sendiri
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(signature, principal, ttl=ttl)
+    return principal
+
+async def get_hero_catalog(db: AsyncSession = Depends(get_db)) -> HeroCatalog:
+    if not hero_catalog.loaded:
+        await db.run_sync(hero_catalog.load)
+    return hero_catalog
+
+async def get_criteria_registry(db: AsyncSession = Depends(get_db)) -> CriteriaRegistry:
+    if not criteria_registry.loaded:
+        await db.run_sync(criteria_registry.load)
+    return criteria_registry
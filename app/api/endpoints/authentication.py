@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from app.core import security
@@ -12,15 +13,24 @@ from app.schemas.token import Token
 router = APIRouter()
 
 @router.post("", response_model=Token, summary="Login untuk mendapatkan access token")
-def login(
-    db: Session = Depends(deps.get_db),
+async def login(
+    db: AsyncSession = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     Otentikasi user dan kembalikan JWT token.
+    Verifikasi bcrypt dijalankan di pool proses terpisah; jika pool penuh, request ditolak dengan 503.
     """
-    user = db.query(models.Users).filter(models.Users.username == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.password):
+    user = await db.scalar(select(models.Users).where(models.Users.username == form_data.username))
+    try:
+        valid = user is not None and await security.verify_password_async(form_data.password, user.password)
+    except security.PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent login attempts, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -30,4 +40,4 @@ def login(
     access_token = security.create_access_token(
         data={"sub": user.username, "id": user.id}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
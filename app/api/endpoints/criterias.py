@@ -1,42 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models import models
+from app.core.criteria_registry import CriteriaRegistry, criteria_registry
 from app.schemas import criteria as criteria_schema
+from app.schemas.recommendation import StatusResponse
+from app.schemas.token import Principal
 
 router = APIRouter()
 
 @router.get("", response_model=criteria_schema.CriteriaResponse, summary="Mendapatkan referensi kriteria dan sub-kriteria")
-def get_all_criterias(
-    db: Session = Depends(deps.get_db),
-    current_user: models.Users = Depends(deps.get_current_user)
+async def get_all_criterias(
+    registry: CriteriaRegistry = Depends(deps.get_criteria_registry),
+    current_user: Principal = Depends(deps.get_current_principal)
 ):
     """
     Mengambil seluruh struktur model AHP, dari tujuan, kriteria, hingga sub-kriteria.
     """
-    all_db_criterias = db.query(models.Criterias).all()
-    
-    # Buat mapping dari code ke object criteria
-    criteria_map = {c.code: c for c in all_db_criterias}
-    
     # Cari tujuan utama (parent is NULL)
-    goal_db = next((c for c in all_db_criterias if c.parent is None), None)
-    if not goal_db:
+    if registry.goal_id is None:
         raise HTTPException(status_code=404, detail="Goal (main objective) not found in database")
 
-    # Buat struktur response
-    response_model = criteria_schema.ModelSchema.from_orm(goal_db)
-    
-    main_criteria_db = [c for c in all_db_criterias if c.parent == goal_db.code]
-    
-    for mc_db in main_criteria_db:
-        main_criteria_schema = criteria_schema.CriteriaSchema.from_orm(mc_db)
-        
-        sub_criteria_db = [c for c in all_db_criterias if c.parent == mc_db.code]
-        for sc_db in sub_criteria_db:
-            main_criteria_schema.sub_criterias.append(criteria_schema.SubCriteriaSchema.from_orm(sc_db))
-        
-        response_model.criterias.append(main_criteria_schema)
+    # Struktur response sudah di-serialize sebelumnya oleh registry
+    return Response(content=registry.body, media_type="application/json")
 
-    return {"status": "success", "model": response_model}
\ No newline at end of file
+
+@router.post("/reload", response_model=StatusResponse, summary="Memuat ulang registry kriteria")
+async def reload_criterias(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Membuang registry kriteria dan memuatnya ulang dari database.
+    """
+    criteria_registry.invalidate()
+    await db.run_sync(criteria_registry.load)
+    return {"status": "success"}
@@ -1,34 +1,45 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 from app.api import deps
-from app.models import models
+from app.core.hero_catalog import HeroCatalog, hero_catalog
 from app.schemas import hero as hero_schema
+from app.schemas.recommendation import StatusResponse
+from app.schemas.token import Principal
 
 router = APIRouter()
 
 @router.get("", response_model=hero_schema.HeroList, summary="Mendapatkan referensi semua hero")
-def get_all_heroes(
-    db: Session = Depends(deps.get_db),
-    current_user: models.Users = Depends(deps.get_current_user)
+async def get_all_heroes(
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    current_user: Principal = Depends(deps.get_current_principal)
 ):
     """
     Mengambil daftar semua hero Dota 2 yang ada di database.
+    Response sudah di-encode dan dikompres sebelumnya di katalog hero.
     """
-    db_heroes = db.query(models.Heroes).order_by(models.Heroes.name).all()
-    
-    heroes_list = []
-    for h in db_heroes:
-        heroes_list.append(
-            hero_schema.Hero(
-                id=h.id,
-                heroName=h.name,
-                heroAttribute=h.attribute,
-                heroAttackType=h.attack_type,
-                heroDifficulty=h.difficulty,
-                heroRole=hero_schema.HeroRole(role1=h.role1, role2=h.role2, role3=h.role3)
-            )
-        )
+    headers = {"ETag": catalog.etag, "Cache-Control": "private, max-age=3600", "Vary": "Accept-Encoding"}
+    if if_none_match and catalog.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
 
-    return {"status": "success", "heroes": heroes_list}
\ No newline at end of file
+    encodings = [e.split(";")[0].strip() for e in (accept_encoding or "").split(",")]
+    if "br" in encodings and catalog.body_brotli is not None:
+        return Response(content=catalog.body_brotli, media_type="application/json", headers={**headers, "Content-Encoding": "br"})
+    if "gzip" in encodings:
+        return Response(content=catalog.body_gzip, media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
+
+
+@router.post("/reload", response_model=StatusResponse, summary="Memuat ulang katalog hero")
+async def reload_heroes(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Memuat ulang katalog hero dari database, misalnya setelah patch baru.
+    """
+    await db.run_sync(hero_catalog.reload)
+    return {"status": "success"}
@@ -1,29 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
+import base64
+import csv
+import io
+from datetime import date
+from enum import Enum
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+from sqlalchemy import desc, select, tuple_
+from typing import List, Optional, Tuple
 
 from app.api import deps
+from app.core.hero_catalog import HeroCatalog
+from app.db import hero_stats
+from app.db.session import open_session
 from app.models import models
 from app.schemas import match as match_schema
 from app.schemas.recommendation import StatusResponse
+from app.schemas.token import Principal
 
 router = APIRouter()
 
 @router.post("/result", response_model=StatusResponse, summary="Mengirimkan hasil pertandingan")
-def submit_result(
+async def submit_result(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     result_in: match_schema.ResultCreate,
-    current_user: models.Users = Depends(deps.get_current_user)
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    current_user: Principal = Depends(deps.get_current_principal)
 ):
     """
     Merekam hasil pertandingan setelah user bermain.
     """
     # Verifikasi bahwa match ini milik user yang sedang login
-    match = db.query(models.Matches).filter(models.Matches.id == result_in.matchId, models.Matches.user_id == current_user.id).first()
+    match = await db.scalar(select(models.Matches).where(models.Matches.id == result_in.matchId, models.Matches.user_id == current_user.id))
     if not match:
         raise HTTPException(status_code=404, detail="Match not found or does not belong to user")
+    if catalog.get(result_in.heroId) is None:
+        raise HTTPException(status_code=400, detail=f"Unknown hero ID: {result_in.heroId}")
 
     db_history = models.Histories(
         match_id=result_in.matchId,
@@ -31,39 +45,98 @@ def submit_result(
         match_result=result_in.result.value
     )
     db.add(db_history)
-    db.commit()
+    # Counter statistik hero ikut di transaksi yang sama dengan history
+    await hero_stats.record_results(db, [(current_user.id, result_in.heroId, match.match_mode, result_in.result)])
+    await db.commit()
     
     return {"status": "success"}
 
 
+def history_filters(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    match_mode: Optional[models.GameModeEnum] = None,
+    match_result: Optional[models.ResultBattleEnum] = None,
+    hero_id: Optional[int] = Query(None, description="Hero yang dipilih user"),
+) -> list:
+    """
+    Kondisi WHERE tambahan untuk riwayat; dipakai bersama oleh /history dan /history/export.
+    """
+    conditions = []
+    if date_from is not None:
+        conditions.append(models.Matches.match_date >= date_from)
+    if date_to is not None:
+        conditions.append(models.Matches.match_date <= date_to)
+    if match_mode is not None:
+        conditions.append(models.Matches.match_mode == match_mode)
+    if match_result is not None:
+        conditions.append(models.Histories.match_result == match_result)
+    if hero_id is not None:
+        conditions.append(models.Histories.hero_id == hero_id)
+    return conditions
+
+
+def history_hero(heroes_map, hero_id: int) -> match_schema.HistoryHero:
+    # Hero yang ada di DB tetapi belum di katalog (sebelum reload) tampil kosong, bukan error 500
+    record = heroes_map.get(hero_id)
+    if record is None:
+        return match_schema.HistoryHero(heroName="", heroAttribute="")
+    return match_schema.HistoryHero(heroName=record.name, heroAttribute=record.attribute)
+
+
+def encode_cursor(match_date: date, match_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{match_date.isoformat()}:{match_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        match_date, match_id = raw.split(":")
+        return date.fromisoformat(match_date), int(match_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/history", response_model=match_schema.HistoryResponse, summary="Melihat riwayat pertandingan")
-def get_history(
-    db: Session = Depends(deps.get_db),
-    current_user: models.Users = Depends(deps.get_current_user)
+async def get_history(
+    db: AsyncSession = Depends(deps.get_db),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="nextCursor dari halaman sebelumnya"),
+    filters: list = Depends(history_filters),
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    current_user: Principal = Depends(deps.get_current_principal)
 ):
     """
-    Mengambil semua riwayat pertandingan milik user.
+    Mengambil riwayat pertandingan milik user, terbaru lebih dulu, per halaman.
+    Halaman berikutnya diminta dengan nextCursor (keyset pada match_date dan id).
     """
-    histories = db.query(models.Histories)\
-        .join(models.Matches)\
-        .filter(models.Matches.user_id == current_user.id)\
-        .order_by(desc(models.Matches.match_date))\
-        .all()
+    statement = (
+        select(models.Histories)
+        .join(models.Histories.match)
+        .options(contains_eager(models.Histories.match))
+        .where(models.Matches.user_id == current_user.id, *filters)
+    )
+    if cursor is not None:
+        # Keyset: lanjut tepat setelah baris terakhir halaman sebelumnya, tanpa OFFSET
+        statement = statement.where(tuple_(models.Matches.match_date, models.Matches.id) < tuple_(*decode_cursor(cursor)))
+
+    # Match dimuat dalam query yang sama (tanpa lazy-load per baris); satu baris ekstra menandai halaman berikutnya
+    histories = (await db.scalars(
+        statement.order_by(desc(models.Matches.match_date), desc(models.Matches.id)).limit(limit + 1)
+    )).all()
+    next_cursor = None
+    if len(histories) > limit:
+        histories = histories[:limit]
+        next_cursor = encode_cursor(histories[-1].match.match_date, histories[-1].match.id)
+
+    # Detail hero (tim kawan, lawan, dan hero yang dipilih) diambil dari katalog hero
+    heroes_map = catalog.by_id
 
     response_matches = []
     for hist in histories:
         match = hist.match
-        your_hero_db = hist.hero
-        
-        # Ambil detail hero tim kawan
         ally_ids = match.allies.get('members', [])
-        allies_db = db.query(models.Heroes).filter(models.Heroes.id.in_(ally_ids)).all()
-        allies_map = {h.id: h for h in allies_db}
-        
-        # Ambil detail hero tim lawan
         enemy_ids = match.enemies.get('members', [])
-        enemies_db = db.query(models.Heroes).filter(models.Heroes.id.in_(enemy_ids)).all()
-        enemies_map = {h.id: h for h in enemies_db}
         
         response_matches.append(
             match_schema.MatchHistory(
@@ -72,12 +145,136 @@ def get_history(
                 matchName=match.match_name,
                 matchMode=match.match_mode,
                 allyTeam=match.ally_team,
-                allies=[match_schema.HistoryHero(heroName=allies_map[id].name, heroAttribute=allies_map[id].attribute) for id in ally_ids if id in allies_map],
+                allies=[history_hero(heroes_map, id) for id in ally_ids if id in heroes_map],
                 enemyTeam=match.enemy_team,
-                enemies=[match_schema.HistoryHero(heroName=enemies_map[id].name, heroAttribute=enemies_map[id].attribute) for id in enemy_ids if id in enemies_map],
-                yourHero=match_schema.HistoryHero(heroName=your_hero_db.name, heroAttribute=your_hero_db.attribute),
+                enemies=[history_hero(heroes_map, id) for id in enemy_ids if id in heroes_map],
+                yourHero=history_hero(heroes_map, hist.hero_id),
                 matchResult=hist.match_result
             )
         )
 
-    return {"status": "success", "matches": response_matches}
\ No newline at end of file
+    return {"status": "success", "matches": response_matches, "nextCursor": next_cursor}
+
+
+@router.get("/history/stats", response_model=match_schema.HeroStatsResponse, summary="Statistik menang/kalah per hero")
+async def get_hero_stats(
+    db: AsyncSession = Depends(deps.get_db),
+    match_mode: Optional[models.GameModeEnum] = None,
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Jumlah menang, kalah, dan seri per hero dan mode permainan, dibaca langsung dari counter hero_stats.
+    """
+    statement = select(models.HeroStats).where(models.HeroStats.user_id == current_user.id)
+    if match_mode is not None:
+        statement = statement.where(models.HeroStats.match_mode == match_mode)
+    rows = (await db.scalars(statement)).all()
+
+    stats = []
+    for row in rows:
+        matches = row.wins + row.losses + row.draws
+        stats.append(match_schema.HeroStat(
+            heroId=row.hero_id,
+            heroName=catalog.name_of(row.hero_id),
+            matchMode=row.match_mode,
+            matches=matches,
+            wins=row.wins,
+            losses=row.losses,
+            draws=row.draws,
+            winRate=round(row.wins / matches, 4) if matches else 0.0
+        ))
+    # Hero yang paling sering dimainkan lebih dulu
+    stats.sort(key=lambda stat: (-stat.matches, stat.heroId, stat.matchMode.value))
+    return {"status": "success", "stats": stats}
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+# Jumlah baris yang diambil dari cursor server-side per partisi
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_CSV_COLUMNS = [
+    "matchId", "matchDate", "matchName", "matchMode", "allyTeam", "allies",
+    "enemyTeam", "enemies", "yourHero", "yourHeroAttribute", "matchResult",
+]
+
+@router.get("/history/export", summary="Mengekspor riwayat pertandingan (NDJSON atau CSV)",
+            responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}})
+async def export_history(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    filters: list = Depends(history_filters),
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Mengalirkan seluruh riwayat pertandingan user per partisi dari cursor server-side,
+    sehingga memori tetap datar berapa pun jumlah barisnya.
+    """
+    statement = (
+        select(
+            models.Matches.id, models.Matches.match_date, models.Matches.match_name, models.Matches.match_mode,
+            models.Matches.ally_team, models.Matches.allies, models.Matches.enemy_team, models.Matches.enemies,
+            models.Histories.hero_id, models.Histories.match_result,
+        )
+        .join(models.Histories, models.Histories.match_id == models.Matches.id)
+        .where(models.Matches.user_id == current_user.id, *filters)
+        .order_by(desc(models.Matches.match_date), desc(models.Matches.id))
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    heroes_map = catalog.by_id
+
+    def ndjson_lines(rows):
+        return "".join(
+            match_schema.MatchHistory(
+                matchId=row.id,
+                matchDate=row.match_date,
+                matchName=row.match_name,
+                matchMode=row.match_mode,
+                allyTeam=row.ally_team,
+                allies=[history_hero(heroes_map, id) for id in row.allies.get('members', []) if id in heroes_map],
+                enemyTeam=row.enemy_team,
+                enemies=[history_hero(heroes_map, id) for id in row.enemies.get('members', []) if id in heroes_map],
+                yourHero=history_hero(heroes_map, row.hero_id),
+                matchResult=row.match_result
+            ).model_dump_json() + "\n"
+            for row in rows
+        )
+
+    def csv_lines(rows, header=False):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(EXPORT_CSV_COLUMNS)
+        for row in rows:
+            your_hero = history_hero(heroes_map, row.hero_id)
+            writer.writerow([
+                row.id, row.match_date.isoformat(), row.match_name, row.match_mode.value,
+                row.ally_team, ";".join(heroes_map[id].name for id in row.allies.get('members', []) if id in heroes_map),
+                row.enemy_team, ";".join(heroes_map[id].name for id in row.enemies.get('members', []) if id in heroes_map),
+                your_hero.heroName, your_hero.heroAttribute, row.match_result.value,
+            ])
+        return buffer.getvalue()
+
+    async def stream():
+        # Session sendiri: cursor harus tetap terbuka selama response dialirkan
+        db = open_session()
+        try:
+            if export_format == ExportFormat.csv:
+                yield csv_lines([], header=True)
+            result = await db.stream(statement)
+            try:
+                async for rows in result.partitions():
+                    yield csv_lines(rows) if export_format == ExportFormat.csv else ndjson_lines(rows)
+            finally:
+                await result.close()
+        finally:
+            await db.close()
+
+    media_type = "text/csv" if export_format == ExportFormat.csv else "application/x-ndjson"
+    return StreamingResponse(
+        stream(), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="history.{export_format.value}"'}
+    )
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.core import security
+from app.db.pool import pool_stats
+from app.schemas.recommendation import StatusResponse
+from app.schemas.token import Principal
+
+router = APIRouter()
+
+@router.get("/password-pool", summary="Statistik pool hashing password")
+async def get_password_pool_stats(
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Kedalaman antrian, jumlah request yang ditolak, dan latensi hashing bcrypt.
+    """
+    return {"status": "success", "passwordPool": security.password_pool.stats()}
+
+
+@router.get("/db-pool", summary="Statistik connection pool database")
+async def get_db_pool_stats(
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Checkout, waktu tunggu, pemakaian overflow, dan invalidasi per connection pool.
+    """
+    return {"status": "success", "pools": {label: stats.snapshot() for label, stats in pool_stats.items()}}
+
+
+@router.post("/users/{user_id}/invalidate-tokens", response_model=StatusResponse, summary="Membuang token ter-cache milik user")
+async def invalidate_user_tokens(
+    user_id: int,
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Dipanggil setelah user dinonaktifkan atau dihapus langsung di database, agar tokennya
+    langsung ditolak alih-alih menunggu TOKEN_CACHE_TTL_SECONDS habis.
+    """
+    deps.invalidate_user(user_id)
+    return {"status": "success"}
@@ -1,22 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.core.hero_catalog import HeroCatalog
+from app.db import match_import
 from app.models import models
 from app.schemas import match as match_schema
+from app.schemas.token import Principal
 
 router = APIRouter()
 
 @router.post("", response_model=match_schema.MatchResponse, summary="Mengirimkan informasi pertandingan baru")
-def create_match(
+async def create_match(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     match_in: match_schema.MatchCreate,
-    current_user: models.Users = Depends(deps.get_current_user)
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    current_user: Principal = Depends(deps.get_current_principal)
 ):
     """
     Membuat record pertandingan baru.
     """
+    unknown_ids = catalog.unknown_ids(match_in.allies + match_in.enemies)
+    if unknown_ids:
+        raise HTTPException(status_code=400, detail=f"Unknown hero IDs: {unknown_ids}")
+
     db_match = models.Matches(
         user_id=current_user.id,
         match_name=match_in.matchName,
@@ -28,7 +38,46 @@ def create_match(
         enemies={"members": match_in.enemies}
     )
     db.add(db_match)
-    db.commit()
-    db.refresh(db_match)
+    await db.commit()
+    await db.refresh(db_match)
     
-    return {"status": "success", "matchId": db_match.id}
\ No newline at end of file
+    return {"status": "success", "matchId": db_match.id}
+
+
+# Event error yang ditahan sebelum dikirim jika potongan berikutnya belum selesai
+EVENT_FLUSH_SIZE = 100
+
+@router.post("/import", summary="Import banyak pertandingan dan hasilnya dari NDJSON",
+             responses={200: {"content": {"application/x-ndjson": {}}, "description": "Event error per baris, progress, dan ringkasan akhir"}})
+async def import_matches(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    chunk_size: int = Query(match_import.DEFAULT_CHUNK_SIZE, ge=1, le=5000),
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Body berisi satu MatchImportRecord per baris (NDJSON). Match dan history ditulis dengan
+    INSERT multi-baris per potongan; baris yang tidak valid dilaporkan tanpa menghentikan import.
+    Event dikirim begitu potongannya di-commit.
+    """
+    # Body di-spool dulu: StreamingResponse ikut membaca receive() untuk deteksi disconnect,
+    # sehingga tidak bisa berjalan bersamaan dengan request.stream()
+    spool = await match_import.spool_body(request.stream())
+    user_id = current_user.id
+
+    async def stream():
+        # Session dari get_db baru ditutup setelah response selesai dikirim, jadi tetap dipakai di sini
+        try:
+            lines = match_import.split_lines(match_import.read_chunks(spool))
+            pending = []
+            async for event in match_import.import_matches(db, user_id, lines, catalog, chunk_size):
+                pending.append(json.dumps(event) + "\n")
+                if event["status"] != "error" or len(pending) >= EVENT_FLUSH_SIZE:
+                    yield "".join(pending)
+                    pending.clear()
+        finally:
+            spool.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
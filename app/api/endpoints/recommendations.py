@@ -1,197 +1,447 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, select, tuple_
 from decimal import Decimal
+from typing import Optional
 
 from app.api import deps
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.criteria_registry import CriteriaRegistry
+from app.core.hero_catalog import HeroCatalog
+from app.core.metrics import timed_phase
+from app.db import bulk
+from app.db.session import open_session
 from app.models import models
 from app.schemas import recommendation as reco_schema
-from app.core.ahp import AHPProcessor
+from app.core.ahp import ranking_weights
+from app.core.scoring import BatchScoreMatrix, ScoreMatrix, WeightSensitivity
+from app.schemas.token import Principal
 
 router = APIRouter()
 
+# Cache pasangan (alias skor, criterion_id) untuk AlternativeScores, per versi registry kriteria
+_alternative_score_columns = (None, [])
+
+def _get_alternative_score_columns(registry: CriteriaRegistry):
+    global _alternative_score_columns
+    version, columns = _alternative_score_columns
+    if version != registry.version:
+        aliases = [field.alias or name for name, field in reco_schema.AlternativeScores.model_fields.items()]
+        columns = [
+            (alias, registry.by_code[alias.replace('_', '-')].id)
+            for alias in aliases
+            if alias.replace('_', '-') in registry.by_code and registry.by_code[alias.replace('_', '-')].parent is not None
+        ]
+        _alternative_score_columns = (registry.version, columns)
+    return columns
+
+# Cache hasil rekomendasi: {match_id: (etag, body JSON)}
+recommendation_cache = LRUCache(maxsize=settings.RECOMMENDATION_CACHE_SIZE)
+
+def _bump_match_version(match: models.Matches):
+    # Counter integer dinaikkan di SQL; tidak bergantung pada resolusi timestamp maupun waktu mulai transaksi
+    match.version = models.Matches.version + 1
+    recommendation_cache.pop(match.id)
+
+def _match_etag(match: models.Matches) -> str:
+    return f'"{match.id}-{match.version}"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
 @router.post("/preferences", response_model=reco_schema.StatusResponse, summary="Mengirimkan preferensi kriteria")
-def submit_preferences(
+async def submit_preferences(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     prefs_in: reco_schema.PreferencesCreate,
-    current_user: models.Users = Depends(deps.get_current_user)
+    registry: CriteriaRegistry = Depends(deps.get_criteria_registry),
+    current_user: Principal = Depends(deps.get_current_principal)
 ):
     """
     Menerima preferensi user, menghitung bobot AHP, dan menyimpannya.
     """
     match_id = prefs_in.matchId
-    match = db.query(models.Matches).filter(models.Matches.id == match_id, models.Matches.user_id == current_user.id).first()
+    match = await db.scalar(select(models.Matches).where(models.Matches.id == match_id, models.Matches.user_id == current_user.id))
     if not match:
         raise HTTPException(status_code=404, detail="Match not found or does not belong to user")
 
-    # Ambil semua kriteria dari DB untuk mapping ID dan Code
-    criterias_db = db.query(models.Criterias).all()
-    criteria_map_id = {c.id: c for c in criterias_db}
-    criteria_map_code = {c.code: c for c in criterias_db}
-    
-    # Hapus bobot lama jika ada
-    db.query(models.Weights).filter(models.Weights.match_id == match_id).delete()
-    db.query(models.Rankings).filter(models.Rankings.match_id == match_id).delete()
+    # --- Fase 1: hitung dan validasi semua bobot tanpa menulis ke DB ---
+    ranking_rows = []
+    weight_rows = {} # {criterion_id: row}, satu baris per kriteria sesuai _match_crit_uc
 
-    # --- 1. Hitung bobot kriteria utama ---
+    # 1. Bobot kriteria utama
     main_criteria_ranks = prefs_in.preferences.criteria
-    goal_id = criteria_map_code['MG'].id # Asumsi 'MG' adalah kode untuk Tujuan Utama
-    
-    # Simpan ranking kriteria utama
-    for i, crit_id in enumerate(main_criteria_ranks):
-        db.add(models.Rankings(match_id=match_id, context_criterion_id=goal_id, criterion_id=crit_id, rank_order=i+1))
+    goal_id = registry.goal_id # Tujuan utama ('MG') adalah kriteria tanpa parent
 
-    ahp_main = AHPProcessor(main_criteria_ranks)
-    if ahp_main.consistency_ratio > 0.1:
-        raise HTTPException(status_code=400, detail=f"Main criteria preferences are inconsistent (CR: {ahp_main.consistency_ratio:.2f})")
-    
-    main_weights = ahp_main.weights
+    # Bobot diambil dari tabel kanonik yang di-cache per ranking
+    with timed_phase("ahp_weights"):
+        main_weights, main_cr = ranking_weights(main_criteria_ranks)
+    if main_cr > 0.1:
+        raise HTTPException(status_code=400, detail=f"Main criteria preferences are inconsistent (CR: {main_cr:.2f})")
+
+    for i, crit_id in enumerate(main_criteria_ranks):
+        ranking_rows.append(dict(match_id=match_id, context_criterion_id=goal_id, criterion_id=crit_id, rank_order=i+1))
     for crit_id, weight in main_weights.items():
-        db.add(models.Weights(match_id=match_id, criterion_id=crit_id, context_criterion_id=goal_id, weight=Decimal(weight)))
+        weight_rows[crit_id] = dict(match_id=match_id, criterion_id=crit_id, context_criterion_id=goal_id, weight=Decimal(weight))
 
-    # --- 2. Hitung bobot sub-kriteria dan bobot global ---
+    # 2. Bobot sub-kriteria dan bobot global
     sub_criteria_groups = prefs_in.preferences.subCriteria.dict()
     for group_name, rankings in sub_criteria_groups.items():
         if not rankings: continue
         
         # Dapatkan parent (context) dari sub-kriteria ini
         first_sub_crit_id = rankings[0]
-        parent_code = criteria_map_id[first_sub_crit_id].parent
-        parent_id = criteria_map_code[parent_code].id
-        
-        # Simpan ranking sub-kriteria
-        for i, crit_id in enumerate(rankings):
-             db.add(models.Rankings(match_id=match_id, context_criterion_id=parent_id, criterion_id=crit_id, rank_order=i+1))
+        parent = registry.parent_of(first_sub_crit_id)
+        if parent is None:
+            raise HTTPException(status_code=400, detail=f"Unknown sub-criteria ID: {first_sub_crit_id}")
+        parent_code = parent.code
+        parent_id = parent.id
 
-        ahp_sub = AHPProcessor(rankings)
-        if ahp_sub.consistency_ratio > 0.1:
-            raise HTTPException(status_code=400, detail=f"Sub-criteria {parent_code} preferences are inconsistent (CR: {ahp_sub.consistency_ratio:.2f})")
+        with timed_phase("ahp_weights"):
+            local_weights, sub_cr = ranking_weights(rankings)
+        if sub_cr > 0.1:
+            raise HTTPException(status_code=400, detail=f"Sub-criteria {parent_code} preferences are inconsistent (CR: {sub_cr:.2f})")
         
-        local_weights = ahp_sub.weights
         parent_global_weight = main_weights.get(parent_id, 0)
-        
+
+        for i, crit_id in enumerate(rankings):
+            ranking_rows.append(dict(match_id=match_id, context_criterion_id=parent_id, criterion_id=crit_id, rank_order=i+1))
         for crit_id, local_weight in local_weights.items():
             global_weight = Decimal(local_weight) * Decimal(parent_global_weight)
-            db.add(models.Weights(match_id=match_id, criterion_id=crit_id, context_criterion_id=parent_id, weight=global_weight))
+            weight_rows[crit_id] = dict(match_id=match_id, criterion_id=crit_id, context_criterion_id=parent_id, weight=global_weight)
 
-    db.commit()
+    # --- Fase 2: simpan semua ranking dan bobot dalam satu transaksi ---
+    # Baris lama yang tidak ada di submission baru (kriteria/grup yang dihapus) ikut dibuang
+    stale_weights = select(models.Weights.id).where(
+        models.Weights.match_id == match_id,
+        models.Weights.criterion_id.notin_(list(weight_rows))
+    )
+    await db.execute(delete(models.Judgements).where(models.Judgements.weight_id.in_(stale_weights)))
+    await db.execute(delete(models.Weights).where(models.Weights.id.in_(stale_weights)))
+    await db.execute(delete(models.Rankings).where(
+        models.Rankings.match_id == match_id,
+        tuple_(models.Rankings.context_criterion_id, models.Rankings.rank_order).notin_(
+            [(row['context_criterion_id'], row['rank_order']) for row in ranking_rows]
+        )
+    ))
+    await bulk.upsert(db, models.Rankings, ranking_rows, constraint='_match_context_rank_uc', update_columns=['criterion_id'])
+    await bulk.upsert(db, models.Weights, list(weight_rows.values()), constraint='_match_crit_uc', update_columns=['context_criterion_id', 'weight'])
+    _bump_match_version(match)
+
+    await db.commit()
     return {"status": "success"}
 
 
 @router.post("/alternatives", response_model=reco_schema.StatusResponse, summary="Mengirimkan penilaian hero alternatif")
-def submit_alternatives(
+async def submit_alternatives(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     alts_in: reco_schema.AlternativesCreate,
-    current_user: models.Users = Depends(deps.get_current_user)
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    registry: CriteriaRegistry = Depends(deps.get_criteria_registry),
+    current_user: Principal = Depends(deps.get_current_principal)
 ):
     """
     Menerima penilaian user untuk 5 hero alternatif terhadap semua sub-kriteria.
     """
     match_id = alts_in.matchId
-    match = db.query(models.Matches).filter(models.Matches.id == match_id, models.Matches.user_id == current_user.id).first()
+    match = await db.scalar(select(models.Matches).where(models.Matches.id == match_id, models.Matches.user_id == current_user.id))
     if not match:
         raise HTTPException(status_code=404, detail="Match not found or does not belong to user")
-    
-    # Hapus data alternatif lama jika ada
-    db.query(models.Alternatives).filter(models.Alternatives.match_id == match_id).delete()
+    unknown_ids = catalog.unknown_ids(h.heroId for h in alts_in.heroes)
+    if unknown_ids:
+        raise HTTPException(status_code=400, detail=f"Unknown hero IDs: {unknown_ids}")
 
-    criterias_db = db.query(models.Criterias).filter(models.Criterias.parent.isnot(None)).all()
-    criteria_map_code = {c.code: c.id for c in criterias_db}
+    # Kolom skor -> criterion_id diselesaikan sekali dan di-cache, bukan per sel
+    score_columns = _get_alternative_score_columns(registry)
 
+    alternative_rows = []
     for hero_alt in alts_in.heroes:
         hero_id = hero_alt.heroId
         scores = hero_alt.alternative.dict(by_alias=True) # by_alias=True untuk mendapatkan key 'PA-HC'
-        
-        for crit_code, score_val in scores.items():
-            crit_id = criteria_map_code.get(crit_code.replace('_', '-'))
-            if crit_id:
-                db_alt = models.Alternatives(
-                    match_id=match_id,
-                    hero_id=hero_id,
-                    criterion_id=crit_id,
-                    score=Decimal(score_val)
-                )
-                db.add(db_alt)
+        alternative_rows.extend(
+            dict(match_id=match_id, hero_id=hero_id, criterion_id=crit_id, score=Decimal(scores[alias]))
+            for alias, crit_id in score_columns
+        )
+
+    # Hapus hanya alternatif milik hero yang tidak lagi dinilai
+    hero_ids = [h.heroId for h in alts_in.heroes]
+    stale_alternatives = select(models.Alternatives.id).where(
+        models.Alternatives.match_id == match_id,
+        models.Alternatives.hero_id.notin_(hero_ids)
+    )
+    await db.execute(delete(models.Judgements).where(models.Judgements.alternative_id.in_(stale_alternatives)))
+    await db.execute(delete(models.Alternatives).where(models.Alternatives.id.in_(stale_alternatives)))
+
+    # Upsert set-based; baris yang skornya tidak berubah tidak ditulis ulang
+    await bulk.upsert(db, models.Alternatives, alternative_rows, constraint='_match_hero_crit_uc', update_columns=['score'], only_changed=True)
+    _bump_match_version(match)
     
-    db.commit()
+    await db.commit()
     return {"status": "success"}
 
 
+async def _load_scoring_rows(db: AsyncSession, match_id: int, goal_id: int):
+    """
+    Bobot global sub-kriteria dan penilaian alternatif sebuah match; 400 jika salah satunya belum dikirim.
+    """
+    # 1. Ambil semua bobot global sub-kriteria (selain bobot terhadap tujuan utama)
+    weights_db = (await db.execute(
+        select(models.Weights.id, models.Weights.criterion_id, models.Weights.weight).where(
+            models.Weights.match_id == match_id,
+            models.Weights.context_criterion_id != goal_id
+        )
+    )).all()
+    if not weights_db:
+        raise HTTPException(status_code=400, detail="Preferences for this match must be submitted first.")
+
+    # 2. Ambil semua penilaian alternatif
+    alternatives_db = (await db.execute(
+        select(models.Alternatives.id, models.Alternatives.hero_id, models.Alternatives.criterion_id, models.Alternatives.score)
+        .where(models.Alternatives.match_id == match_id)
+    )).all()
+    if not alternatives_db:
+        raise HTTPException(status_code=400, detail="Alternatives for this match must be submitted first.")
+
+    return weights_db, alternatives_db
+
+
 @router.get("/{match_id}", response_model=reco_schema.RecommendationResponse, summary="Mendapatkan rekomendasi hero")
-def get_recommendation(
+async def get_recommendation(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     match_id: int,
-    current_user: models.Users = Depends(deps.get_current_user)
+    persist: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    registry: CriteriaRegistry = Depends(deps.get_criteria_registry),
+    current_user: Principal = Depends(deps.get_current_principal)
 ):
     """
     Menghitung skor akhir dan memberikan urutan rekomendasi hero.
+    Perhitungan murni di memori; gunakan persist=true untuk menyimpan judgements dan scores.
+    Response membawa ETag; If-None-Match yang cocok dibalas 304.
     """
-    match = db.query(models.Matches).filter(models.Matches.id == match_id, models.Matches.user_id == current_user.id).first()
+    # Query ini sekaligus menjadi cek kepemilikan dan cek versi
+    match = await db.scalar(select(models.Matches).where(models.Matches.id == match_id, models.Matches.user_id == current_user.id))
     if not match:
         raise HTTPException(status_code=404, detail="Match not found or does not belong to user")
 
-    # 1. Ambil semua bobot global sub-kriteria
-    goal_id = db.query(models.Criterias.id).filter(models.Criterias.parent.is_(None)).scalar()
-    weights_db = db.query(models.Weights).filter(
-        models.Weights.match_id == match_id,
-        models.Weights.context_criterion_id != goal_id
-    ).all()
-    if not weights_db:
+    etag = _match_etag(match)
+    if not persist:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        cached = recommendation_cache.get(match_id)
+        if cached and cached[0] == etag:
+            return Response(content=cached[1], media_type="application/json", headers={"ETag": etag})
+
+    weights_db, alternatives_db = await _load_scoring_rows(db, match_id, registry.goal_id)
+
+    # 3. Skor akhir = matriks penilaian (hero x sub-kriteria) . vektor bobot
+    with timed_phase("scoring"):
+        score_matrix = ScoreMatrix(
+            ((a.hero_id, a.criterion_id, a.score) for a in alternatives_db),
+            {w.criterion_id: w.weight for w in weights_db}
+        )
+        ranking = score_matrix.ranking()
+
+    if persist:
+        await _persist_scores(db, match_id, weights_db, alternatives_db)
+
+    # Nama hero diambil dari katalog hero di memori
+    with timed_phase("serialization"):
+        body = reco_schema.RecommendationResponse(
+            status="success",
+            recommendations=[
+                reco_schema.RecommendationHero(
+                    heroId=hero_id,
+                    heroName=catalog.name_of(hero_id),
+                    finalScore=round(final_score, 5) # Presisi sama dengan kolom scores.final_score
+                ) for hero_id, final_score in ranking
+            ]
+        ).model_dump_json().encode()
+    recommendation_cache.set(match_id, (etag, body))
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/{match_id}/sensitivity", response_model=reco_schema.SensitivityResponse,
+            summary="Analisis sensitivitas ranking terhadap bobot kriteria")
+async def get_sensitivity(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    match_id: int,
+    samples: int = Query(settings.SENSITIVITY_DEFAULT_SAMPLES, ge=1, le=settings.SENSITIVITY_MAX_SAMPLES),
+    concentration: float = Query(100.0, gt=0, description="Semakin besar, sampel bobot semakin dekat ke bobot tersimpan"),
+    time_budget_ms: int = Query(settings.SENSITIVITY_TIME_BUDGET_MS, ge=1, le=settings.SENSITIVITY_MAX_TIME_BUDGET_MS),
+    seed: Optional[int] = Query(None, ge=0),
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    registry: CriteriaRegistry = Depends(deps.get_criteria_registry),
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Sampling bobot Dirichlet di sekitar bobot tersimpan dan frekuensi setiap peringkat per hero.
+    Sampling berhenti lebih awal jika time_budget_ms habis (truncated=true).
+    """
+    match_owned = await db.scalar(select(models.Matches.id).where(models.Matches.id == match_id, models.Matches.user_id == current_user.id))
+    if not match_owned:
+        raise HTTPException(status_code=404, detail="Match not found or does not belong to user")
+
+    weights_db, alternatives_db = await _load_scoring_rows(db, match_id, registry.goal_id)
+
+    def analyse():
+        score_matrix = ScoreMatrix(
+            ((a.hero_id, a.criterion_id, a.score) for a in alternatives_db),
+            {w.criterion_id: w.weight for w in weights_db}
+        )
+        # Semua bobot nol tidak bisa dinormalisasi menjadi alpha Dirichlet; perlakukan seperti preferensi belum lengkap
+        if not score_matrix.weights.sum() > 0:
+            return score_matrix, None
+        return score_matrix, WeightSensitivity(score_matrix, samples, concentration, time_budget_ms / 1000, seed)
+
+    # Sampling memakan CPU hingga time budget; jalankan di threadpool agar event loop tetap responsif
+    with timed_phase("sensitivity"):
+        score_matrix, analysis = await run_in_threadpool(analyse)
+    if analysis is None:
         raise HTTPException(status_code=400, detail="Preferences for this match must be submitted first.")
-    
-    weights_map = {w.criterion_id: w for w in weights_db}
 
-    # 2. Ambil semua penilaian alternatif
-    alternatives_db = db.query(models.Alternatives).filter(models.Alternatives.match_id == match_id).all()
-    if not alternatives_db:
-        raise HTTPException(status_code=400, detail="Alternatives for this match must be submitted first.")
-    
-    # --- AWAL PERBAIKAN ---
-    # Hapus data lama dengan cara yang aman
-    weight_ids_to_delete = [w.id for w in weights_db]
-    if weight_ids_to_delete:
-        db.query(models.Judgements).filter(models.Judgements.weight_id.in_(weight_ids_to_delete)).delete(synchronize_session=False)
-    db.query(models.Scores).filter(models.Scores.match_id == match_id).delete(synchronize_session=False)
-    # --- AKHIR PERBAIKAN ---
-    
-    # 3. Hitung judgement (score * weight)
+    base_order = sorted(range(len(score_matrix.hero_ids)), key=lambda i: -analysis.base_scores[i])
+    base_ranks = {hero_index: rank for rank, hero_index in enumerate(base_order, start=1)}
+    frequencies = analysis.rank_frequencies()
+    mean_ranks = analysis.mean_ranks()
+    return reco_schema.SensitivityResponse(
+        status="success",
+        samples=analysis.samples,
+        requestedSamples=samples,
+        truncated=analysis.truncated,
+        elapsedMs=round(analysis.elapsed * 1000, 3),
+        heroes=[
+            reco_schema.SensitivityHero(
+                heroId=score_matrix.hero_ids[i],
+                heroName=catalog.name_of(score_matrix.hero_ids[i]),
+                finalScore=round(float(analysis.base_scores[i]), 5),
+                baseRank=base_ranks[i],
+                meanRank=round(float(mean_ranks[i]), 4),
+                rankFrequencies=[round(float(f), 6) for f in frequencies[i]],
+            ) for i in base_order
+        ]
+    )
+
+
+# Jumlah match yang di-score dan dikirim per potongan stream
+BATCH_CHUNK_SIZE = 100
+
+@router.post("/batch", summary="Mendapatkan rekomendasi hero untuk banyak match sekaligus",
+             responses={200: {"content": {"application/x-ndjson": {}}, "description": "Satu BatchRecommendationItem per baris"}})
+async def get_recommendations_batch(
+    *,
+    batch_in: reco_schema.BatchRecommendationRequest,
+    catalog: HeroCatalog = Depends(deps.get_hero_catalog),
+    registry: CriteriaRegistry = Depends(deps.get_criteria_registry),
+    current_user: Principal = Depends(deps.get_current_principal)
+):
+    """
+    Menghitung rekomendasi untuk banyak match per potongan BATCH_CHUNK_SIZE: tiga query set-based
+    dan satu tensor skor per potongan, dikirim sebagai NDJSON (satu match per baris, sesuai urutan
+    matchIds) begitu potongan itu selesai. Tidak menulis ke database.
+    """
+    match_ids = list(dict.fromkeys(batch_in.matchIds))
+    if len(match_ids) > settings.RECOMMENDATION_BATCH_MAX_MATCHES:
+        raise HTTPException(status_code=400, detail=f"At most {settings.RECOMMENDATION_BATCH_MAX_MATCHES} match IDs per batch")
+    goal_id = registry.goal_id
+
+    def error_line(match_id: int, detail: str) -> bytes:
+        return reco_schema.BatchRecommendationItem(matchId=match_id, status="error", detail=detail).model_dump_json(exclude_none=True).encode() + b"\n"
+
+    async def load_chunk(db, chunk):
+        owned_ids = set((await db.scalars(
+            select(models.Matches.id).where(models.Matches.id.in_(chunk), models.Matches.user_id == current_user.id)
+        )).all())
+        if not owned_ids:
+            return owned_ids, {}, {}
+        weights_db = (await db.execute(
+            select(models.Weights.match_id, models.Weights.criterion_id, models.Weights.weight).where(
+                models.Weights.match_id.in_(owned_ids),
+                models.Weights.context_criterion_id != goal_id
+            )
+        )).all()
+        alternatives_db = (await db.execute(
+            select(models.Alternatives.match_id, models.Alternatives.hero_id, models.Alternatives.criterion_id, models.Alternatives.score)
+            .where(models.Alternatives.match_id.in_(owned_ids))
+        )).all()
+
+        weights_by_match = {}
+        for w in weights_db:
+            weights_by_match.setdefault(w.match_id, []).append(w)
+        alternatives_by_match = {}
+        for a in alternatives_db:
+            alternatives_by_match.setdefault(a.match_id, []).append(a)
+        return owned_ids, weights_by_match, alternatives_by_match
+
+    async def stream():
+        # Session sendiri: query tiap potongan berjalan selama response dialirkan
+        db = open_session()
+        try:
+            for start in range(0, len(match_ids), BATCH_CHUNK_SIZE):
+                chunk = match_ids[start:start + BATCH_CHUNK_SIZE]
+                owned_ids, weights_by_match, alternatives_by_match = await load_chunk(db, chunk)
+                with timed_phase("scoring"):
+                    rankings = BatchScoreMatrix(
+                        ((a.match_id, a.hero_id, a.criterion_id, a.score) for m in chunk for a in alternatives_by_match.get(m, ())),
+                        ((w.match_id, w.criterion_id, w.weight) for m in chunk for w in weights_by_match.get(m, ()))
+                    ).rankings()
+                with timed_phase("serialization"):
+                    lines = []
+                    for match_id in chunk:
+                        if match_id not in owned_ids:
+                            lines.append(error_line(match_id, "Match not found or does not belong to user"))
+                        elif match_id not in weights_by_match:
+                            lines.append(error_line(match_id, "Preferences for this match must be submitted first."))
+                        elif match_id not in rankings:
+                            lines.append(error_line(match_id, "Alternatives for this match must be submitted first."))
+                        else:
+                            lines.append(reco_schema.BatchRecommendationItem(
+                                matchId=match_id,
+                                status="success",
+                                recommendations=[
+                                    reco_schema.RecommendationHero(
+                                        heroId=hero_id,
+                                        heroName=catalog.name_of(hero_id),
+                                        finalScore=round(final_score, 5)
+                                    ) for hero_id, final_score in rankings[match_id]
+                                ]
+                            ).model_dump_json(exclude_none=True).encode() + b"\n")
+                yield b"".join(lines)
+        finally:
+            await db.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+async def _persist_scores(db: AsyncSession, match_id: int, weights_db, alternatives_db):
+    # Simpan judgement (score * weight) dan skor akhir per hero
+    weights_map = {w.criterion_id: w for w in weights_db}
+    judgement_rows = []
     hero_scores = {} # {hero_id: total_score}
-    
     for alt in alternatives_db:
         weight_obj = weights_map.get(alt.criterion_id)
         if weight_obj:
             weight_score = alt.score * weight_obj.weight
-            
-            # Simpan ke tabel judgements
-            db.add(models.Judgements(weight_id=weight_obj.id, alternative_id=alt.id, weight_score=weight_score))
-            
-            # Akumulasi skor
-            if alt.hero_id not in hero_scores:
-                hero_scores[alt.hero_id] = Decimal(0)
-            hero_scores[alt.hero_id] += weight_score
-
-    # 4. Simpan skor akhir ke tabel scores
-    for hero_id, final_score in hero_scores.items():
-        db.add(models.Scores(match_id=match_id, hero_id=hero_id, final_score=final_score))
-        
-    db.commit()
-
-    # 5. Ambil hasil dari tabel scores dan urutkan
-    final_scores_db = db.query(models.Scores)\
-        .options(joinedload(models.Scores.hero))\
-        .filter(models.Scores.match_id == match_id)\
-        .order_by(desc(models.Scores.final_score))\
-        .all()
-        
-    recommendations = [
-        reco_schema.RecommendationHero(
-            heroId=s.hero_id,
-            heroName=s.hero.name,
-            finalScore=float(s.final_score)
-        ) for s in final_scores_db
-    ]
-
-    return {"status": "success", "recommendations": recommendations}
\ No newline at end of file
+            judgement_rows.append(dict(weight_id=weight_obj.id, alternative_id=alt.id, weight_score=weight_score))
+            hero_scores[alt.hero_id] = hero_scores.get(alt.hero_id, Decimal(0)) + weight_score
+
+    score_rows = [dict(match_id=match_id, hero_id=hero_id, final_score=final_score) for hero_id, final_score in hero_scores.items()]
+
+    await db.execute(delete(models.Scores).where(
+        models.Scores.match_id == match_id,
+        models.Scores.hero_id.notin_(list(hero_scores))
+    ))
+    await bulk.upsert(db, models.Judgements, judgement_rows, constraint='_weight_alt_uc', update_columns=['weight_score'], only_changed=True)
+    await bulk.upsert(db, models.Scores, score_rows, constraint='_match_hero_score_uc', update_columns=['final_score'], only_changed=True)
+    await db.commit()
@@ -1,68 +1,224 @@
 import numpy as np
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Sequence, Tuple
+
+from app.core.metrics import timed_phase
+
+RI_TABLE = {
+    1: 0.0, 2: 0.0, 3: 0.52, 4: 0.89, 5: 1.11, 6: 1.25, 7: 1.35,
+    8: 1.40, 9: 1.45, 10: 1.49, 11: 1.51, 12: 1.54, 13: 1.56, 14: 1.57, 15: 1.58
+}
+
+
+def _importance_matrix(n: int) -> np.ndarray:
+    # Menggunakan skala Saaty 1-9
+    # Perbedaan peringkat 0 -> 1 (sama penting)
+    # Perbedaan peringkat 1 -> 3
+    # Perbedaan peringkat 2 -> 5
+    # dst.
+    positions = np.arange(n)
+    diff = positions[None, :] - positions[:, None]
+    importance = np.minimum(1 + 2 * np.abs(diff), 9).astype(float) # Skala Saaty yang disederhanakan
+    # Peringkat lebih tinggi (indeks lebih kecil) lebih penting dari yang di bawahnya
+    return np.where(diff >= 0, importance, 1 / importance)
+
+
+def _consistency_ratio(lambda_max: float, n: int) -> float:
+    if n <= 2:
+        return 0.0
+    ci = (lambda_max - n) / (n - 1)
+    ri = RI_TABLE.get(n, 1.58)
+    if ri == 0:
+        return 0.0
+    return ci / ri
+
+
+def _solve_eig(matrix: np.ndarray, tol: float, max_iter: int) -> Tuple[np.ndarray, float, int]:
+    # Dekomposisi penuh; lambda max dan eigenvector berasal dari satu panggilan eig
+    eigenvalues, eigenvectors = np.linalg.eig(matrix)
+    max_eigenvalue_index = np.argmax(eigenvalues)
+    priority_vector = np.real(eigenvectors[:, max_eigenvalue_index])
+    lambda_max = float(np.real(eigenvalues[max_eigenvalue_index]))
+    return priority_vector / np.sum(priority_vector), lambda_max, 1
+
+
+def _solve_power(matrix: np.ndarray, tol: float, max_iter: int) -> Tuple[np.ndarray, float, int]:
+    # Matriks positif dan resiprokal, jadi power iteration konvergen ke eigenvector utama
+    n = matrix.shape[0]
+    vector = np.full(n, 1.0 / n)
+    lambda_max = float(n)
+    iterations = 0
+    while iterations < max_iter:
+        iterations += 1
+        product = matrix @ vector
+        lambda_max = float(np.sum(product)) # vector dinormalisasi sehingga sum = 1
+        next_vector = product / lambda_max
+        converged = np.max(np.abs(next_vector - vector)) < tol
+        vector = next_vector
+        if converged:
+            break
+    return vector, lambda_max, iterations
+
+
+def _solve_geometric_mean(matrix: np.ndarray, tol: float, max_iter: int) -> Tuple[np.ndarray, float, int]:
+    # Aproksimasi rata-rata geometrik baris; lambda max diestimasi dari (A w)_i / w_i
+    row_means = np.exp(np.mean(np.log(matrix), axis=1))
+    vector = row_means / np.sum(row_means)
+    lambda_max = float(np.mean((matrix @ vector) / vector))
+    return vector, lambda_max, 1
+
+
+SOLVERS = {
+    "eig": _solve_eig,
+    "power": _solve_power,
+    "geometric_mean": _solve_geometric_mean,
+}
+
 
 class AHPProcessor:
-    def __init__(self, rankings: List[int]):
+    def __init__(self, rankings: List[int], method: str = "eig", tol: float = 1e-10, max_iter: int = 100):
         self.rankings = rankings
         self.num_criteria = len(rankings)
         if self.num_criteria == 0:
             raise ValueError("Ranking list cannot be empty.")
-        self.pairwise_matrix = self._create_pairwise_matrix()
-        self.weights = self._calculate_priority_vector()
-        self.consistency_ratio = self._check_consistency()
+        if method not in SOLVERS:
+            raise ValueError(f"Unknown AHP solver '{method}'. Available: {', '.join(SOLVERS)}")
+        self.method = method
+        self.tol = tol
+        self.max_iter = max_iter
+        self.iterations = 0
+        self.lambda_max = float(self.num_criteria)
+        with timed_phase("ahp_matrix_build"):
+            self.pairwise_matrix = self._create_pairwise_matrix()
+        with timed_phase("ahp_eigen_solve"):
+            self.weights = self._calculate_priority_vector()
+            self.consistency_ratio = self._check_consistency()
 
     def _create_pairwise_matrix(self) -> np.ndarray:
-        n = self.num_criteria
-        matrix = np.ones((n, n))
-        rank_map = {crit_id: i for i, crit_id in enumerate(self.rankings)}
-        
-        # Menggunakan skala Saaty 1-9
-        # Perbedaan peringkat 0 -> 1 (sama penting)
-        # Perbedaan peringkat 1 -> 3
-        # Perbedaan peringkat 2 -> 5
-        # dst.
-        for i in range(n):
-            for j in range(i + 1, n):
-                rank_i = list(rank_map.keys()).index(self.rankings[i])
-                rank_j = list(rank_map.keys()).index(self.rankings[j])
-                
-                diff = abs(rank_i - rank_j)
-                importance = min(1 + 2 * diff, 9) # Skala Saaty yang disederhanakan
-                
-                if rank_i < rank_j:
-                    matrix[i, j] = importance
-                    matrix[j, i] = 1 / importance
-                else:
-                    matrix[i, j] = 1 / importance
-                    matrix[j, i] = importance
-        return matrix
+        # Posisi dalam list adalah peringkatnya, jadi matriks hanya bergantung pada n
+        return _importance_matrix(self.num_criteria)
 
     def _calculate_priority_vector(self) -> Dict[int, float]:
         if self.num_criteria == 1:
             return {self.rankings[0]: 1.0}
-            
-        eigenvalues, eigenvectors = np.linalg.eig(self.pairwise_matrix)
-        max_eigenvalue_index = np.argmax(eigenvalues)
-        priority_vector = np.real(eigenvectors[:, max_eigenvalue_index])
-        normalized_vector = priority_vector / np.sum(priority_vector)
-        
+
+        solver = SOLVERS[self.method]
+        normalized_vector, self.lambda_max, self.iterations = solver(self.pairwise_matrix, self.tol, self.max_iter)
+
         weights_dict = {self.rankings[i]: normalized_vector[i] for i in range(self.num_criteria)}
         return weights_dict
 
     def _check_consistency(self) -> float:
-        if self.num_criteria <= 2:
-            return 0.0
-
-        RI_TABLE = {
-            1: 0.0, 2: 0.0, 3: 0.52, 4: 0.89, 5: 1.11, 6: 1.25, 7: 1.35,
-            8: 1.40, 9: 1.45, 10: 1.49, 11: 1.51, 12: 1.54, 13: 1.56, 14: 1.57, 15: 1.58
-        }
-        
-        lambda_max = np.max(np.real(np.linalg.eigvals(self.pairwise_matrix)))
-        ci = (lambda_max - self.num_criteria) / (self.num_criteria - 1)
-        ri = RI_TABLE.get(self.num_criteria, 1.58)
-        
-        if ri == 0:
-            return 0.0
-        
-        return ci / ri
\ No newline at end of file
+        # lambda max sudah dihitung oleh solver pada langkah yang sama
+        return _consistency_ratio(self.lambda_max, self.num_criteria)
+
+
+class AHPBatchProcessor:
+    """
+    Menghitung bobot AHP untuk banyak daftar ranking sekaligus.
+
+    Semua matriks pairwise disusun menjadi satu array (B, n, n), di mana n adalah
+    panjang ranking terpanjang. Ranking yang lebih pendek diisi nol di luar blok
+    n_i x n_i miliknya; karena lambda max blok tersebut >= n_i > 0, eigenvector
+    utamanya bernilai nol pada bagian padding, sehingga cukup satu panggilan
+    np.linalg.eig untuk seluruh batch.
+    """
+    def __init__(self, rankings_batch: Sequence[Sequence[int]]):
+        self.rankings_batch = [list(r) for r in rankings_batch]
+        self.batch_size = len(self.rankings_batch)
+        if self.batch_size == 0:
+            raise ValueError("Rankings batch cannot be empty.")
+        self.lengths = np.array([len(r) for r in self.rankings_batch], dtype=int)
+        if np.any(self.lengths == 0):
+            raise ValueError("Ranking list cannot be empty.")
+        self.max_criteria = int(self.lengths.max())
+        with timed_phase("ahp_matrix_build"):
+            self.pairwise_matrices = self._create_pairwise_matrices()
+        with timed_phase("ahp_eigen_solve"):
+            self.weights, self.consistency_ratios = self._solve()
+
+    def _create_pairwise_matrices(self) -> np.ndarray:
+        n = self.max_criteria
+        full = _importance_matrix(n)
+        idx = np.arange(n)
+        # mask[b, i, j] True jika i dan j berada di dalam blok ranking ke-b
+        inside = idx[None, :] < self.lengths[:, None]
+        mask = inside[:, :, None] & inside[:, None, :]
+        return np.where(mask, full[None, :, :], 0.0)
+
+    def _solve(self):
+        eigenvalues, eigenvectors = np.linalg.eig(self.pairwise_matrices)
+        real_eigenvalues = np.real(eigenvalues)
+        max_idx = np.argmax(real_eigenvalues, axis=1)
+        batch_idx = np.arange(self.batch_size)
+
+        lambda_max = real_eigenvalues[batch_idx, max_idx]
+        priority = np.real(eigenvectors[batch_idx, :, max_idx])
+        weights = priority / np.sum(priority, axis=1, keepdims=True)
+
+        consistency_ratios = np.array([
+            _consistency_ratio(lam, int(n)) for lam, n in zip(lambda_max, self.lengths)
+        ])
+        return weights, consistency_ratios
+
+    def weights_dict(self, index: int) -> Dict[int, float]:
+        rankings = self.rankings_batch[index]
+        return {crit_id: self.weights[index, i] for i, crit_id in enumerate(rankings)}
+
+
+# --- Tabel bobot kanonik ---
+# Matriks pairwise hanya bergantung pada posisi dalam ranking, sehingga setiap
+# ranking dengan panjang n menghasilkan vektor bobot dan CR yang sama (hanya
+# dipetakan ke ID kriteria yang berbeda). Tabel diisi sekali untuk n <= 15 dan
+# secara lazy untuk n yang lebih besar.
+CANONICAL_MAX_CRITERIA = 15
+RANKING_CACHE_SIZE = 4096
+
+_canonical_table: Dict[int, Tuple[Tuple[float, ...], float]] = {}
+
+
+def _build_canonical_table(sizes: Sequence[int]) -> None:
+    batch = AHPBatchProcessor([list(range(n)) for n in sizes])
+    for i, n in enumerate(sizes):
+        weights = tuple(float(w) for w in batch.weights[i, :n])
+        _canonical_table[n] = (weights, float(batch.consistency_ratios[i]))
+
+
+def canonical_weights(n: int) -> Tuple[Tuple[float, ...], float]:
+    """
+    Mengembalikan (bobot per posisi ranking, consistency ratio) untuk ranking sepanjang n.
+    """
+    if n <= 0:
+        raise ValueError("Ranking list cannot be empty.")
+    if n not in _canonical_table:
+        if not _canonical_table:
+            _build_canonical_table(range(1, CANONICAL_MAX_CRITERIA + 1))
+        if n not in _canonical_table:
+            _build_canonical_table([n])
+    return _canonical_table[n]
+
+
+@lru_cache(maxsize=RANKING_CACHE_SIZE)
+def _cached_ranking_weights(rankings: Tuple[int, ...]) -> Tuple[Tuple[Tuple[int, float], ...], float]:
+    weights, consistency_ratio = canonical_weights(len(rankings))
+    return tuple(zip(rankings, weights)), consistency_ratio
+
+
+def ranking_weights(rankings: Sequence[int]) -> Tuple[Dict[int, float], float]:
+    """
+    Mengembalikan (bobot per ID kriteria, consistency ratio) untuk satu ranking,
+    dengan hasil yang di-cache per tuple ranking.
+    """
+    weights, consistency_ratio = _cached_ranking_weights(tuple(rankings))
+    return dict(weights), consistency_ratio
+
+
+def ranking_cache_info():
+    """
+    Statistik cache ranking (hits, misses, maxsize, currsize).
+    """
+    return _cached_ranking_weights.cache_info()
+
+
+def clear_ranking_cache() -> None:
+    _cached_ranking_weights.cache_clear()
@@ -6,9 +6,38 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # DB_ASYNC=true memakai AsyncEngine (asyncpg); default tetap engine sync (psycopg2)
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+    ASYNC_DATABASE_URL: str = os.getenv(
+        "ASYNC_DATABASE_URL",
+        (os.getenv("DATABASE_URL") or "").replace("postgresql://", "postgresql+asyncpg://", 1).replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    )
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+    # Pengaturan connection pool; DB_NULL_POOL=true untuk deployment di belakang pgbouncer
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", -1))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+    DB_NULL_POOL: bool = os.getenv("DB_NULL_POOL", "false").lower() in ("1", "true", "yes")
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+    # Profiler query: header X-DB-Queries/X-DB-Time per request dan log query di atas DB_SLOW_QUERY_MS
+    DB_PROFILER: bool = os.getenv("DB_PROFILER", "false").lower() in ("1", "true", "yes")
+    DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", 0))
+    DB_SLOW_QUERY_EXPLAIN: bool = os.getenv("DB_SLOW_QUERY_EXPLAIN", "false").lower() in ("1", "true", "yes")
+    PASSWORD_POOL_WORKERS: int = int(os.getenv("PASSWORD_POOL_WORKERS", os.cpu_count() or 2))
+    PASSWORD_POOL_MAX_QUEUE: int = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", 32))
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300))
+    RECOMMENDATION_CACHE_SIZE: int = int(os.getenv("RECOMMENDATION_CACHE_SIZE", 1024))
+    RECOMMENDATION_BATCH_MAX_MATCHES: int = int(os.getenv("RECOMMENDATION_BATCH_MAX_MATCHES", 1000))
+    # Analisis sensitivitas Monte Carlo: jumlah sampel bobot dan batas waktu sampling per request
+    SENSITIVITY_DEFAULT_SAMPLES: int = int(os.getenv("SENSITIVITY_DEFAULT_SAMPLES", 5000))
+    SENSITIVITY_MAX_SAMPLES: int = int(os.getenv("SENSITIVITY_MAX_SAMPLES", 100000))
+    SENSITIVITY_TIME_BUDGET_MS: int = int(os.getenv("SENSITIVITY_TIME_BUDGET_MS", 250))
+    SENSITIVITY_MAX_TIME_BUDGET_MS: int = int(os.getenv("SENSITIVITY_MAX_TIME_BUDGET_MS", 2000))
 
     class Config:
         case_sensitive = True
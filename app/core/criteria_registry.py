@@ -0,0 +1,92 @@
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app.schemas import criteria as criteria_schema
+
+
+class CriteriaRecord(NamedTuple):
+    id: int
+    code: str
+    parent: Optional[str]
+    name: str
+    description: Optional[str]
+    paraphrase: Optional[str]
+    narration: Optional[str]
+
+
+class CriteriaRegistry:
+    """
+    Registry model kriteria AHP di memori: tujuan, kriteria utama, dan sub-kriteria.
+    Dimuat sekali dan dipakai bersama oleh /criterias dan endpoint rekomendasi.
+    Panggil invalidate() jika model kriteria di database berubah.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.version = 0
+        self.by_id: Dict[int, CriteriaRecord] = {}
+        self.by_code: Dict[str, CriteriaRecord] = {}
+        self.parent_id: Dict[int, Optional[int]] = {}
+        self.children: Dict[int, Tuple[int, ...]] = {}
+        self.goal_id: Optional[int] = None
+        self.body = b""
+
+    def load(self, db: Session) -> None:
+        rows = db.query(
+            models.Criterias.id, models.Criterias.code, models.Criterias.parent, models.Criterias.name,
+            models.Criterias.description, models.Criterias.paraphrase, models.Criterias.narration
+        ).order_by(models.Criterias.id).all()
+        records = [CriteriaRecord(*row) for row in rows]
+
+        by_id = {c.id: c for c in records}
+        by_code = {c.code: c for c in records}
+        parent_id = {c.id: (by_code[c.parent].id if c.parent in by_code else None) for c in records}
+
+        # Indeks anak per parent dalam satu lintasan, bukan scan ulang per parent
+        children: Dict[int, list] = {c.id: [] for c in records}
+        for c in records:
+            if parent_id[c.id] is not None:
+                children[parent_id[c.id]].append(c.id)
+        children = {pid: tuple(ids) for pid, ids in children.items()}
+
+        goal = next((c for c in records if c.parent is None), None)
+        body = self._serialize_tree(goal, by_id, children) if goal else b""
+
+        with self._lock:
+            self.by_id = by_id
+            self.by_code = by_code
+            self.parent_id = parent_id
+            self.children = children
+            self.goal_id = goal.id if goal else None
+            self.body = body
+            self.version += 1
+            self.loaded = True
+
+    @staticmethod
+    def _serialize_tree(goal: CriteriaRecord, by_id, children) -> bytes:
+        response_model = criteria_schema.ModelSchema.model_validate(goal._asdict())
+        for mc_id in children[goal.id]:
+            main_criteria_schema = criteria_schema.CriteriaSchema.model_validate(by_id[mc_id]._asdict())
+            for sc_id in children[mc_id]:
+                main_criteria_schema.sub_criterias.append(criteria_schema.SubCriteriaSchema.model_validate(by_id[sc_id]._asdict()))
+            response_model.criterias.append(main_criteria_schema)
+        return criteria_schema.CriteriaResponse(status="success", model=response_model).model_dump_json().encode()
+
+    def ensure_loaded(self, db: Session) -> "CriteriaRegistry":
+        if not self.loaded:
+            self.load(db)
+        return self
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.loaded = False
+
+    def parent_of(self, criterion_id: int) -> Optional[CriteriaRecord]:
+        pid = self.parent_id.get(criterion_id)
+        return self.by_id[pid] if pid is not None else None
+
+
+criteria_registry = CriteriaRegistry()
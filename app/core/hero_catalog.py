@@ -0,0 +1,103 @@
+import gzip
+import hashlib
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app.schemas import hero as hero_schema
+
+try:
+    import brotli
+except ImportError: # brotli opsional; tanpa brotli hanya gzip yang disediakan
+    brotli = None
+
+
+class HeroRecord(NamedTuple):
+    id: int
+    name: str
+    attribute: str
+    attack_type: str
+    difficulty: str
+    role1: str
+    role2: Optional[str]
+    role3: Optional[str]
+
+
+class HeroCatalog:
+    """
+    Katalog hero di memori. Dimuat sekali dari tabel heroes (berubah hanya saat patch),
+    menyimpan baris dalam bentuk tuple immutable dengan indeks ID dan nama, serta
+    response /heroes yang sudah di-encode JSON dan dikompres.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.heroes: Tuple[HeroRecord, ...] = ()
+        self.by_id: Dict[int, HeroRecord] = {}
+        self.by_name: Dict[str, HeroRecord] = {}
+        self.body = b""
+        self.body_gzip = b""
+        self.body_brotli: Optional[bytes] = None
+        self.etag = ""
+
+    def load(self, db: Session) -> None:
+        rows = db.query(
+            models.Heroes.id, models.Heroes.name, models.Heroes.attribute, models.Heroes.attack_type,
+            models.Heroes.difficulty, models.Heroes.role1, models.Heroes.role2, models.Heroes.role3
+        ).order_by(models.Heroes.name).all()
+        heroes = tuple(HeroRecord(*row) for row in rows)
+
+        body = hero_schema.HeroList(
+            status="success",
+            heroes=[
+                hero_schema.Hero(
+                    id=h.id,
+                    heroName=h.name,
+                    heroAttribute=h.attribute,
+                    heroAttackType=h.attack_type,
+                    heroDifficulty=h.difficulty,
+                    heroRole=hero_schema.HeroRole(role1=h.role1, role2=h.role2, role3=h.role3)
+                ) for h in heroes
+            ]
+        ).model_dump_json().encode()
+
+        # Semua atribut diganti bersamaan agar pembaca tidak melihat katalog setengah jadi
+        with self._lock:
+            self.heroes = heroes
+            self.by_id = {h.id: h for h in heroes}
+            self.by_name = {h.name: h for h in heroes}
+            self.body = body
+            self.body_gzip = gzip.compress(body)
+            self.body_brotli = brotli.compress(body) if brotli else None
+            self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            self.loaded = True
+
+    def reload(self, db: Session) -> None:
+        self.load(db)
+
+    def ensure_loaded(self, db: Session) -> "HeroCatalog":
+        if not self.loaded:
+            self.load(db)
+        return self
+
+    def get(self, hero_id: int) -> Optional[HeroRecord]:
+        return self.by_id.get(hero_id)
+
+    def name_of(self, hero_id: int) -> str:
+        # Hero yang ada di DB tetapi belum di katalog (sebelum reload) tampil tanpa nama, bukan error 500
+        hero = self.by_id.get(hero_id)
+        return hero.name if hero is not None else ""
+
+    def get_many(self, hero_ids: Iterable[int]) -> List[HeroRecord]:
+        # Urutan mengikuti input; ID yang tidak dikenal dilewati
+        by_id = self.by_id
+        return [by_id[i] for i in hero_ids if i in by_id]
+
+    def unknown_ids(self, hero_ids: Iterable[int]) -> List[int]:
+        by_id = self.by_id
+        return [i for i in hero_ids if i not in by_id]
+
+
+hero_catalog = HeroCatalog()
@@ -0,0 +1,115 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class MetricsRegistry:
+    """
+    Registry metrik minimal (counter, histogram, dan gauge via collector) yang
+    dirender dalam format teks Prometheus tanpa dependensi eksternal.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, List[float]]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._help[name] = ("counter", help_text)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._help[name] = ("histogram", help_text)
+        self._histograms.setdefault(name, {})
+        self._buckets[name] = buckets
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]) -> None:
+        """
+        collector() menghasilkan (nama, help, labels, nilai) yang dirender sebagai gauge saat scrape.
+        """
+        self._collectors.append(collector)
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1.0) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        key = tuple(sorted(labels.items()))
+        buckets = self._buckets[name]
+        with self._lock:
+            series = self._histograms[name]
+            state = series.get(key)
+            if state is None:
+                # [count per bucket..., +Inf, sum]
+                state = series[key] = [0.0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[len(buckets)] += 1
+            state[len(buckets) + 1] += value
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f"# HELP {name} {self._help[name][1]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in self._histograms.items():
+                buckets = self._buckets[name]
+                lines.append(f"# HELP {name} {self._help[name][1]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, state in series.items():
+                    for i, bound in enumerate(buckets):
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', repr(bound)),))} {state[i]}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {state[len(buckets)]}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {state[len(buckets) + 1]}")
+                    lines.append(f"{name}_count{_format_labels(key)} {state[len(buckets)]}")
+
+        seen = set()
+        for collector in self._collectors:
+            for name, help_text, labels, value in collector():
+                if name not in seen:
+                    lines.append(f"# HELP {name} {help_text}")
+                    lines.append(f"# TYPE {name} gauge")
+                    seen.add(name)
+                lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.counter("http_requests_total", "Jumlah request HTTP per route, method, dan status code.")
+metrics.histogram("http_request_duration_seconds", "Latensi request HTTP per route dan method.")
+metrics.histogram("app_phase_duration_seconds", "Durasi fase internal (JWT decode, AHP, scoring, serialisasi).")
+
+
+@contextmanager
+def timed_phase(phase: str):
+    """
+    Ukur durasi satu fase internal, misalnya `with timed_phase("eigen_solve"): ...`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe("app_phase_duration_seconds", {"phase": phase}, time.perf_counter() - start)
@@ -0,0 +1,166 @@
+import time
+import numpy as np
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class ScoreMatrix:
+    """
+    Matriks penilaian hero x sub-kriteria beserta vektor bobot global sub-kriteria.
+
+    alternatives: iterable (hero_id, criterion_id, score)
+    weights: mapping criterion_id -> bobot global
+    Skor yang kriterianya tidak memiliki bobot diabaikan, sama seperti perhitungan judgement;
+    hero yang semua skornya diabaikan tidak muncul di ranking.
+    """
+    def __init__(self, alternatives: Iterable[Tuple[int, int, float]], weights: Mapping[int, float]):
+        self.criterion_ids = np.fromiter(weights.keys(), dtype=np.int64, count=len(weights))
+        self.weights = np.fromiter((float(w) for w in weights.values()), dtype=float, count=len(weights))
+
+        alt = np.array([(h, c, float(s)) for h, c, s in alternatives], dtype=float).reshape(-1, 3)
+        alt_criteria = alt[:, 1].astype(np.int64)
+
+        order = np.argsort(self.criterion_ids)
+        sorted_criteria = self.criterion_ids[order]
+        pos = np.searchsorted(sorted_criteria, alt_criteria)
+        pos = np.minimum(pos, max(len(sorted_criteria) - 1, 0))
+        known = (sorted_criteria[pos] == alt_criteria) if len(sorted_criteria) else np.zeros(len(alt), dtype=bool)
+
+        # Hero tanpa satu pun skor berbobot tidak ikut diranking (sama dengan BatchScoreMatrix)
+        self.hero_ids, hero_idx = np.unique(alt[known, 0].astype(np.int64), return_inverse=True)
+
+        self.scores = np.zeros((len(self.hero_ids), len(self.criterion_ids)))
+        self.scores[hero_idx, order[pos[known]]] = alt[known, 2]
+
+    def final_scores(self) -> np.ndarray:
+        return self.scores @ self.weights
+
+    def ranking(self) -> List[Tuple[int, float]]:
+        """
+        Daftar (hero_id, skor akhir) terurut dari skor tertinggi.
+        """
+        final = self.final_scores()
+        order = np.argsort(-final, kind="stable")
+        return [(int(self.hero_ids[i]), float(final[i])) for i in order]
+
+
+
+class WeightSensitivity:
+    """
+    Analisis sensitivitas Monte Carlo: bobot sub-kriteria diambil dari distribusi Dirichlet
+    di sekitar bobot tersimpan (alpha = concentration * bobot ternormalisasi), lalu semua
+    sampel dalam satu potongan di-score dengan satu perkalian matriks (hero x sampel).
+
+    rank_counts[h, r] adalah berapa kali hero ke-h (urutan score_matrix.hero_ids) berada di
+    peringkat r (0 = teratas). Sampling berhenti saat num_samples tercapai atau time_budget
+    (detik) habis; potongan pertama selalu dihitung.
+    """
+    BATCH_SIZE = 2048
+
+    def __init__(self, score_matrix: ScoreMatrix, num_samples: int, concentration: float,
+                 time_budget: float, seed: Optional[int] = None):
+        self.hero_ids = score_matrix.hero_ids
+        self.base_scores = score_matrix.final_scores()
+        num_heroes = len(self.hero_ids)
+
+        total = score_matrix.weights.sum()
+        if not total > 0:
+            raise ValueError("Sensitivity analysis needs at least one positive weight")
+        weights = score_matrix.weights / total
+        # Dirichlet membutuhkan alpha > 0; bobot nol tetap hampir nol di setiap sampel
+        alpha = np.maximum(concentration * weights, 1e-6)
+        rng = np.random.default_rng(seed)
+
+        self.rank_counts = np.zeros((num_heroes, num_heroes), dtype=np.int64)
+        self.samples = 0
+        start = time.perf_counter()
+        hero_idx = np.arange(num_heroes)[:, None]
+        while self.samples < num_samples:
+            batch = min(self.BATCH_SIZE, num_samples - self.samples)
+            sampled = rng.dirichlet(alpha, size=batch)            # (sampel, kriteria)
+            scores = score_matrix.scores @ sampled.T              # (hero, sampel)
+            order = np.argsort(-scores, axis=0, kind="stable")    # order[r, s] = hero di peringkat r
+            ranks = np.empty_like(order)
+            ranks[order, np.arange(batch)] = hero_idx
+            self.rank_counts += np.bincount(
+                (hero_idx * num_heroes + ranks).ravel(), minlength=num_heroes * num_heroes
+            ).reshape(num_heroes, num_heroes)
+            self.samples += batch
+            if time.perf_counter() - start >= time_budget:
+                break
+        self.elapsed = time.perf_counter() - start
+        self.truncated = self.samples < num_samples
+
+    def rank_frequencies(self) -> np.ndarray:
+        return self.rank_counts / max(self.samples, 1)
+
+    def mean_ranks(self) -> np.ndarray:
+        # Peringkat rata-rata berbasis 1
+        positions = np.arange(1, len(self.hero_ids) + 1)
+        return self.rank_counts @ positions / max(self.samples, 1)
+
+
+class BatchScoreMatrix:
+    """
+    Skor banyak match sekaligus sebagai tensor (match x hero x sub-kriteria).
+
+    alternatives: iterable (match_id, hero_id, criterion_id, score)
+    weights: iterable (match_id, criterion_id, bobot global)
+    Hero per match diisi ke slot 0..n-1 (urut hero_id) dan sisanya dibiarkan nol,
+    sehingga skor akhir semua match dihitung dengan satu einsum.
+    """
+    def __init__(self, alternatives: Iterable[Tuple[int, int, int, float]], weights: Iterable[Tuple[int, int, float]]):
+        w = np.array([(m, c, float(x)) for m, c, x in weights], dtype=float).reshape(-1, 3)
+        alt = np.array([(m, h, c, float(s)) for m, h, c, s in alternatives], dtype=float).reshape(-1, 4)
+
+        self.match_ids, w_match = np.unique(w[:, 0].astype(np.int64), return_inverse=True)
+        self.criterion_ids, w_crit = np.unique(w[:, 1].astype(np.int64), return_inverse=True)
+        self.weights = np.zeros((len(self.match_ids), len(self.criterion_ids)))
+        self.weights[w_match, w_crit] = w[:, 2]
+
+        # Penilaian untuk match atau kriteria tanpa bobot diabaikan, sama seperti ScoreMatrix
+        alt_match = alt[:, 0].astype(np.int64)
+        alt_heroes = alt[:, 1].astype(np.int64)
+        alt_criteria = alt[:, 2].astype(np.int64)
+        m_pos = _positions(self.match_ids, alt_match)
+        c_pos = _positions(self.criterion_ids, alt_criteria)
+        known = (m_pos >= 0) & (c_pos >= 0)
+        m_pos, c_pos, alt_heroes, values = m_pos[known], c_pos[known], alt_heroes[known], alt[known, 3]
+
+        # Slot hero per match: pasangan (match, hero) unik, terurut per match lalu per hero_id
+        pairs, pair_idx = np.unique(np.stack([m_pos, alt_heroes], axis=1), axis=0, return_inverse=True)
+        pair_idx = pair_idx.reshape(-1)
+        pair_match = pairs[:, 0] if len(pairs) else np.zeros(0, dtype=np.int64)
+        self.hero_counts = np.bincount(pair_match, minlength=len(self.match_ids))
+        first_slot = np.concatenate([[0], np.cumsum(self.hero_counts)[:-1]]) if len(self.match_ids) else np.zeros(0, dtype=np.int64)
+        slots = np.arange(len(pairs)) - first_slot[pair_match]
+
+        max_heroes = int(self.hero_counts.max()) if len(self.hero_counts) else 0
+        self.hero_ids = np.full((len(self.match_ids), max_heroes), -1, dtype=np.int64)
+        self.hero_ids[pair_match, slots] = pairs[:, 1] if len(pairs) else []
+        self.scores = np.zeros((len(self.match_ids), max_heroes, len(self.criterion_ids)))
+        self.scores[m_pos, slots[pair_idx], c_pos] = values
+
+    def final_scores(self) -> np.ndarray:
+        return np.einsum("bhc,bc->bh", self.scores, self.weights)
+
+    def rankings(self) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        {match_id: daftar (hero_id, skor akhir) terurut dari skor tertinggi} untuk match yang punya penilaian.
+        """
+        final = self.final_scores()
+        result = {}
+        for b, match_id in enumerate(self.match_ids):
+            n = int(self.hero_counts[b])
+            if n == 0:
+                continue
+            order = np.argsort(-final[b, :n], kind="stable")
+            result[int(match_id)] = [(int(self.hero_ids[b, i]), float(final[b, i])) for i in order]
+        return result
+
+
+def _positions(sorted_ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # Indeks setiap nilai di sorted_ids, atau -1 jika tidak ada
+    if len(sorted_ids) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    pos = np.minimum(np.searchsorted(sorted_ids, values), len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == values, pos, -1)
@@ -1,3 +1,10 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -12,6 +19,122 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+# --- Pool proses khusus untuk bcrypt ---
+# bcrypt memakan ~100-300 ms CPU per operasi. Menjalankannya di pool proses terpisah
+# dengan antrian terbatas mencegah lonjakan login menghabiskan threadpool FastAPI.
+
+class PasswordPoolBusy(Exception):
+    # Pool penuh, atau pool baru saja rusak (worker mati) dan akan dibuat ulang; klien cukup mencoba lagi
+    pass
+
+
+def _timed_verify(plain_password: str, hashed_password: str):
+    start = time.perf_counter()
+    return verify_password(plain_password, hashed_password), time.perf_counter() - start
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+class PasswordHasherPool:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self.wait_seconds_total = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, bukan fork: fork di server yang sudah multithread bisa mewarisi lock yang sedang dipegang
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # Request lain yang gagal bersamaan tidak boleh membuang pool pengganti yang sudah dibuat
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self) -> None:
+        """
+        Buat pool dan nyalakan semua worker sekarang (dari startup hook), bukan saat login pertama.
+        """
+        executor = self._get_executor()
+        # Satu tugas per worker; worker baru di-spawn selama belum ada yang menganggur
+        wait([executor.submit(_warm_up) for _ in range(self.workers)])
+
+    async def run(self, fn, *args):
+        # Tolak langsung jika semua worker sibuk dan antrian penuh
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolBusy("Password hashing pool is saturated")
+        with self._lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        executor = self._get_executor()
+        try:
+            result, hash_seconds = await asyncio.wrap_future(executor.submit(fn, *args))
+        except BrokenProcessPool:
+            # Worker mati membuat seluruh pool tidak bisa dipakai; buang agar panggilan berikutnya membuat pool baru
+            self._discard(executor)
+            raise PasswordPoolBusy("Password hashing pool was restarted")
+        finally:
+            self._slots.release()
+            with self._lock:
+                self.in_flight -= 1
+        total_seconds = time.perf_counter() - start
+        with self._lock:
+            self.completed += 1
+            self.hash_seconds_total += hash_seconds
+            self.hash_seconds_max = max(self.hash_seconds_max, hash_seconds)
+            self.wait_seconds_total += max(total_seconds - hash_seconds, 0.0)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queue_depth": max(self.in_flight - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                "hash_seconds_avg": self.hash_seconds_total / self.completed if self.completed else 0.0,
+                "hash_seconds_max": self.hash_seconds_max,
+                "wait_seconds_avg": self.wait_seconds_total / self.completed if self.completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_pool = PasswordHasherPool(settings.PASSWORD_POOL_WORKERS, settings.PASSWORD_POOL_MAX_QUEUE)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(_timed_verify, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
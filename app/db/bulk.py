@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Sequence
+from sqlalchemy import UniqueConstraint, func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _constraint_columns(table, constraint: str) -> List[str]:
+    for c in table.constraints:
+        if isinstance(c, UniqueConstraint) and c.name == constraint:
+            return [col.name for col in c.columns]
+    raise ValueError(f"Unique constraint '{constraint}' not found on table '{table.name}'")
+
+
+# Dialek yang mendukung INSERT ... ON CONFLICT DO UPDATE dengan API yang sama
+_INSERT_BY_DIALECT = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_statement(
+    model,
+    rows: List[Dict[str, Any]],
+    constraint: str,
+    update_columns: Sequence[str],
+    only_changed: bool = False,
+    dialect: str = "postgresql",
+    increment_columns: Sequence[str] = (),
+):
+    """
+    Satu statement INSERT ... ON CONFLICT DO UPDATE multi-baris untuk semua rows.
+    Dengan only_changed=True, baris yang nilainya tidak berubah tidak di-update.
+    Kolom di increment_columns ditambahkan ke nilai lama (counter), bukan ditimpa.
+    """
+    if dialect not in _INSERT_BY_DIALECT:
+        raise ValueError(f"Upsert is not supported for dialect '{dialect}'")
+    table = model.__table__
+    stmt = _INSERT_BY_DIALECT[dialect](table).values(rows)
+    set_ = {col: stmt.excluded[col] for col in update_columns}
+    set_.update({col: table.c[col] + stmt.excluded[col] for col in increment_columns})
+    if "updated_at" in table.c:
+        set_["updated_at"] = func.now()
+    where = None
+    if only_changed:
+        where = or_(*(table.c[col].is_distinct_from(stmt.excluded[col]) for col in update_columns))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_constraint_columns(table, constraint),
+        set_=set_,
+        where=where,
+    )
+    return stmt
+
+
+async def upsert(
+    db: AsyncSession,
+    model,
+    rows: List[Dict[str, Any]],
+    constraint: str,
+    update_columns: Sequence[str],
+    only_changed: bool = False,
+    increment_columns: Sequence[str] = (),
+) -> None:
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    await db.execute(upsert_statement(model, rows, constraint, update_columns, only_changed, dialect, increment_columns))
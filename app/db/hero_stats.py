@@ -0,0 +1,61 @@
+from collections import Counter
+from typing import Iterable, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db import bulk
+from app.models import models
+
+# Kolom counter untuk setiap hasil pertandingan
+RESULT_COLUMNS = {
+    models.ResultBattleEnum.win: "wins",
+    models.ResultBattleEnum.lose: "losses",
+    models.ResultBattleEnum.draw: "draws",
+}
+
+
+async def record_results(db: AsyncSession, results: Iterable[Tuple[int, int, models.GameModeEnum, models.ResultBattleEnum]]) -> None:
+    """
+    Tambahkan hasil (user_id, hero_id, match_mode, result) ke counter hero_stats dengan satu
+    upsert multi-baris. Tidak melakukan commit: dipanggil dalam transaksi yang menulis Histories.
+    """
+    counts = Counter()
+    for user_id, hero_id, match_mode, result in results:
+        counts[(user_id, hero_id, models.GameModeEnum(match_mode), RESULT_COLUMNS[models.ResultBattleEnum(result)])] += 1
+
+    rows = {}
+    for (user_id, hero_id, match_mode, column), count in counts.items():
+        row = rows.setdefault((user_id, hero_id, match_mode), dict(
+            user_id=user_id, hero_id=hero_id, match_mode=match_mode, wins=0, losses=0, draws=0
+        ))
+        row[column] += count
+    await bulk.upsert(
+        db, models.HeroStats, list(rows.values()), constraint='_user_hero_mode_uc',
+        update_columns=[], increment_columns=list(RESULT_COLUMNS.values())
+    )
+
+
+def rebuild_users(db: Session, user_ids: Sequence[int]) -> int:
+    """
+    Hitung ulang hero_stats untuk sekumpulan user dari Histories x Matches (INSERT ... SELECT).
+    Mengembalikan jumlah baris counter yang ditulis; commit dilakukan oleh pemanggil.
+    """
+    counters = [
+        func.sum(case((models.Histories.match_result == result, 1), else_=0)).label(column)
+        for result, column in RESULT_COLUMNS.items()
+    ]
+    aggregated = (
+        select(models.Matches.user_id, models.Histories.hero_id, models.Matches.match_mode, *counters)
+        .join(models.Matches, models.Matches.id == models.Histories.match_id)
+        .where(models.Matches.user_id.in_(user_ids))
+        .group_by(models.Matches.user_id, models.Histories.hero_id, models.Matches.match_mode)
+    )
+    db.execute(delete(models.HeroStats).where(models.HeroStats.user_id.in_(user_ids)))
+    result = db.execute(
+        insert(models.HeroStats).from_select(
+            ["user_id", "hero_id", "match_mode", *RESULT_COLUMNS.values()], aggregated
+        )
+    )
+    return result.rowcount
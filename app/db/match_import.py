@@ -0,0 +1,155 @@
+import json
+import tempfile
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.hero_catalog import HeroCatalog
+from app.db import hero_stats
+from app.models import models
+from app.schemas.match import MatchImportRecord
+
+DEFAULT_CHUNK_SIZE = 500
+# Body import disimpan di memori sampai batas ini, selebihnya di file sementara
+SPOOL_MAX_MEMORY = 1024 * 1024
+SPOOL_READ_SIZE = 64 * 1024
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'record'}: {err['msg']}" for err in exc.errors())
+
+
+def parse_record(raw: Union[bytes, str], catalog: HeroCatalog) -> MatchImportRecord:
+    """
+    Parse dan validasi satu baris NDJSON. ValueError berisi pesan error untuk baris tersebut.
+    """
+    try:
+        record = MatchImportRecord.model_validate(json.loads(raw))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON: {exc.msg}")
+    except ValidationError as exc:
+        raise ValueError(_validation_detail(exc))
+    if (record.heroId is None) != (record.result is None):
+        raise ValueError("heroId and result must be given together")
+    hero_ids = record.allies + record.enemies + ([record.heroId] if record.heroId is not None else [])
+    unknown_ids = catalog.unknown_ids(hero_ids)
+    if unknown_ids:
+        raise ValueError(f"Unknown hero IDs: {unknown_ids}")
+    return record
+
+
+async def split_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """
+    Ubah aliran potongan byte (mis. request.stream()) menjadi baris-baris NDJSON.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+async def spool_body(chunks: AsyncIterable[bytes]) -> tempfile.SpooledTemporaryFile:
+    """
+    Simpan seluruh body (mis. request.stream()) ke SpooledTemporaryFile, siap dibaca dari awal.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in chunks:
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def read_chunks(handle, size: int = SPOOL_READ_SIZE) -> AsyncIterator[bytes]:
+    while True:
+        chunk = handle.read(size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _write_chunk(db: AsyncSession, user_id: int, records: List[Tuple[int, MatchImportRecord]]) -> None:
+    # Satu INSERT multi-baris untuk matches; RETURNING id (urut sesuai parameter) menghubungkan histories
+    match_ids = (await db.scalars(
+        insert(models.Matches).returning(models.Matches.id, sort_by_parameter_order=True),
+        [
+            dict(
+                user_id=user_id,
+                match_name=record.matchName,
+                match_date=record.matchDate,
+                match_mode=record.matchMode.value,
+                ally_team=record.allyTeam,
+                allies={"members": record.allies},
+                enemy_team=record.enemyTeam,
+                enemies={"members": record.enemies},
+            )
+            for _, record in records
+        ],
+    )).all()
+    history_rows = [
+        dict(match_id=match_id, hero_id=record.heroId, match_result=record.result.value)
+        for match_id, (_, record) in zip(match_ids, records)
+        if record.heroId is not None
+    ]
+    if history_rows:
+        await db.execute(insert(models.Histories), history_rows)
+        await hero_stats.record_results(db, (
+            (user_id, record.heroId, record.matchMode, record.result)
+            for _, record in records if record.heroId is not None
+        ))
+    await db.commit()
+
+
+async def import_matches(
+    db: AsyncSession,
+    user_id: int,
+    lines: AsyncIterable[Union[bytes, str]],
+    catalog: HeroCatalog,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Import match (dan history) dari baris NDJSON, di-commit per potongan chunk_size baris valid.
+    Menghasilkan event: error per baris, progress per potongan, dan ringkasan akhir ("done").
+    Baris yang tidak valid atau potongan yang gagal ditulis tidak menghentikan import.
+    """
+    processed = imported = errors = 0
+    pending: List[Tuple[int, MatchImportRecord]] = []
+
+    async def flush():
+        nonlocal imported, errors
+        try:
+            await _write_chunk(db, user_id, pending)
+            imported += len(pending)
+            failed = []
+        except Exception as exc:
+            await db.rollback()
+            errors += len(pending)
+            failed = [{"line": line_no, "status": "error", "detail": f"Write failed: {exc.__class__.__name__}"} for line_no, _ in pending]
+        pending.clear()
+        return failed
+
+    line_no = 0
+    async for raw in lines:
+        line_no += 1
+        if not raw.strip():
+            continue
+        processed += 1
+        try:
+            pending.append((line_no, parse_record(raw, catalog)))
+        except ValueError as exc:
+            errors += 1
+            yield {"line": line_no, "status": "error", "detail": str(exc)}
+        if len(pending) >= chunk_size:
+            for event in await flush():
+                yield event
+            yield {"status": "progress", "processed": processed, "imported": imported, "errors": errors}
+
+    if pending:
+        for event in await flush():
+            yield event
+    yield {"status": "done", "processed": processed, "imported": imported, "errors": errors}
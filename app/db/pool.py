@@ -0,0 +1,148 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import settings
+
+
+class PoolStats:
+    """
+    Statistik satu connection pool, diisi dari event pool SQLAlchemy.
+    """
+    def __init__(self, label: str):
+        self.label = label
+        self._lock = threading.Lock()
+        self.pool = None
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_max = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.checkout_timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.pool
+        with self._lock:
+            data = {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "softInvalidations": self.soft_invalidations,
+                "checkoutTimeouts": self.checkout_timeouts,
+                "waitSecondsAvg": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+                "waitSecondsMax": self.wait_seconds_max,
+                "overflowMax": self.overflow_max,
+            }
+        if isinstance(pool, QueuePool):
+            data.update(size=pool.size(), checkedOut=pool.checkedout(), checkedIn=pool.checkedin(), overflow=pool.overflow())
+        return data
+
+
+pool_stats: Dict[str, PoolStats] = {}
+
+
+class _WaitTimingMixin:
+    # Event pool tidak punya hook "sebelum checkout", jadi waktu tunggu diukur di sekitar _do_get
+    _stats: PoolStats = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except Exception:
+            timed_out = True
+            raise
+        finally:
+            if self._stats is not None:
+                self._stats.record_wait(time.perf_counter() - start, timed_out)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(is_async: bool) -> Dict[str, Any]:
+    """
+    Argumen create_engine / create_async_engine dari pengaturan pool di Settings.
+    """
+    options: Dict[str, Any] = {}
+    if settings.DB_NULL_POOL:
+        # Untuk deployment di belakang pgbouncer: koneksi tidak ditahan oleh aplikasi
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    options["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def instrument(engine, label: str) -> PoolStats:
+    """
+    Pasang listener event pool pada engine dan daftarkan statistiknya dengan label tertentu.
+    """
+    stats = PoolStats(label)
+    pool = engine.pool
+    stats.pool = pool
+    if isinstance(pool, _WaitTimingMixin):
+        pool._stats = stats
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        with stats._lock:
+            stats.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with stats._lock:
+            stats.checkouts += 1
+            if isinstance(pool, QueuePool):
+                stats.overflow_max = max(stats.overflow_max, pool.overflow())
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        with stats._lock:
+            stats.checkins += 1
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        with stats._lock:
+            stats.invalidations += 1
+
+    @event.listens_for(pool, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        with stats._lock:
+            stats.soft_invalidations += 1
+
+    pool_stats[label] = stats
+    return stats
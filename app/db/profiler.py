@@ -0,0 +1,85 @@
+import contextvars
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db.profiler")
+
+
+class QueryProfile:
+    """
+    Jumlah query dan total waktu database untuk satu request.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.seconds += seconds
+
+
+_current_profile: contextvars.ContextVar[Optional[QueryProfile]] = contextvars.ContextVar("db_query_profile", default=None)
+
+
+def start_profile() -> Optional[contextvars.Token]:
+    """
+    Mulai profil baru untuk konteks (request) saat ini. Mengembalikan None jika profiler tidak aktif.
+    """
+    if not settings.DB_PROFILER:
+        return None
+    return _current_profile.set(QueryProfile())
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current_profile.get()
+
+
+def stop_profile(token: Optional[contextvars.Token]) -> None:
+    if token is not None:
+        _current_profile.reset(token)
+
+
+def _explain(conn, cursor, statement, parameters) -> Optional[str]:
+    # Hanya SELECT yang di-EXPLAIN ANALYZE: statement lain akan dieksekusi ulang beserta efek sampingnya
+    if conn.dialect.name != "postgresql" or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute("EXPLAIN ANALYZE " + statement, parameters)
+        return "\n".join(row[0] for row in explain_cursor.fetchall())
+    except Exception as exc:
+        return f"EXPLAIN ANALYZE gagal: {exc}"
+    finally:
+        explain_cursor.close()
+
+
+def instrument(engine) -> None:
+    """
+    Pasang listener cursor pada engine (untuk AsyncEngine: engine.sync_engine).
+    """
+    slow_seconds = settings.DB_SLOW_QUERY_MS / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(elapsed)
+        if settings.DB_SLOW_QUERY_MS and elapsed >= slow_seconds:
+            plan = _explain(conn, cursor, statement, parameters) if settings.DB_SLOW_QUERY_EXPLAIN else None
+            logger.warning(
+                "Query lambat (%.1f ms): %s\nParameter: %r%s",
+                elapsed * 1000, statement, parameters, f"\n{plan}" if plan else "",
+            )
@@ -1,6 +1,105 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.db import profiler
+from app.db.pool import engine_options, instrument
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+engine = create_engine(settings.DATABASE_URL, **engine_options(is_async=False))
+instrument(engine, "sync")
+if settings.DB_PROFILER or settings.DB_SLOW_QUERY_MS:
+    profiler.instrument(engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Mode async (asyncpg) dipilih lewat DB_ASYNC; mode sync tetap tersedia selama migrasi
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **engine_options(is_async=True))
+    instrument(async_engine.sync_engine, "async")
+    if settings.DB_PROFILER or settings.DB_SLOW_QUERY_MS:
+        profiler.instrument(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def open_session():
+    """
+    Session untuk mode yang aktif: AsyncSession, atau Session sync yang dibungkus SyncSessionAdapter.
+    Keduanya ditutup dengan `await db.close()`.
+    """
+    if AsyncSessionLocal is not None:
+        return AsyncSessionLocal()
+    return SyncSessionAdapter(SessionLocal())
+
+
+class SyncSessionAdapter:
+    """
+    Membungkus Session sync dengan antarmuka yang sama seperti AsyncSession, sehingga
+    endpoint async bisa berjalan di atas engine psycopg2. Setiap operasi I/O
+    dijalankan di threadpool.
+    """
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def get_bind(self, *args, **kwargs):
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def refresh(self, instance, *args, **kwargs) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def flush(self, *args, **kwargs) -> None:
+        await run_in_threadpool(self.sync_session.flush, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def stream(self, statement, *args, **kwargs) -> "SyncStreamResult":
+        # Seperti AsyncSession.stream: cursor server-side, baris diambil per partisi
+        result = await run_in_threadpool(
+            self.sync_session.execute, statement.execution_options(stream_results=True), *args, **kwargs
+        )
+        return SyncStreamResult(result)
+
+
+class SyncStreamResult:
+    """
+    Padanan minimal AsyncResult untuk SyncSessionAdapter.stream(): partitions() dan close().
+    """
+    def __init__(self, result):
+        self.result = result
+
+    async def partitions(self, size=None):
+        partitions = self.result.partitions(size)
+        while True:
+            partition = await run_in_threadpool(next, partitions, None)
+            if partition is None:
+                break
+            yield partition
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.result.close)
@@ -0,0 +1,14 @@
+from sqlalchemy import JSON, Enum
+from sqlalchemy.dialects.postgresql import ENUM, JSONB
+
+# JSONB di PostgreSQL, JSON biasa di dialek lain (mis. SQLite untuk test dan benchmark)
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+def enum_column_type(enum_class, name: str):
+    """
+    ENUM native di PostgreSQL (tipe sudah dibuat di database, jadi create_type=False),
+    VARCHAR dengan CHECK constraint di dialek lain.
+    """
+    portable = Enum(enum_class, name=name, native_enum=False, create_constraint=True)
+    return portable.with_variant(ENUM(enum_class, name=name, create_type=False), "postgresql")
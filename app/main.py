@@ -1,24 +1,108 @@
-from fastapi import FastAPI, APIRouter
-from app.api.endpoints import authentication, heroes, criterias, matches, recommendations, history
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, APIRouter, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from app.api.endpoints import authentication, heroes, criterias, matches, recommendations, history, internal
+from app.core import security
+from app.core.criteria_registry import criteria_registry
+from app.core.ahp import ranking_cache_info
+from app.core.hero_catalog import hero_catalog
+from app.core.metrics import metrics
+from app.db.pool import pool_stats
+from app.db.session import open_session
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Katalog hero dan registry kriteria dimuat sekali saat startup dan dipakai bersama oleh semua endpoint
+    db = open_session()
+    try:
+        await db.run_sync(hero_catalog.load)
+        await db.run_sync(criteria_registry.load)
+    finally:
+        await db.close()
+    # Worker bcrypt di-spawn sekarang agar login pertama tidak menanggung biaya start proses
+    await run_in_threadpool(security.password_pool.start)
+    try:
+        yield
+    finally:
+        security.password_pool.shutdown()
 
 app = FastAPI(
     title="Dota 2 Hero Recommendation API",
     description="REST API untuk memberikan rekomendasi hero Dota 2 menggunakan metode AHP.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Membuat prefix untuk semua endpoint
 api_router = APIRouter(prefix="/api/v1")
 
-api_router.include_router(authentication.router, prefix="/authentication", tags=["Authentication"])
-api_router.include_router(heroes.router, prefix="/heroes", tags=["Heroes"])
-api_router.include_router(criterias.router, prefix="/criterias", tags=["Criterias"])
-api_router.include_router(matches.router, prefix="/matches", tags=["Matches"])
-api_router.include_router(recommendations.router, prefix="/recommendations", tags=["Recommendations"])
-api_router.include_router(history.router, tags=["History"]) # Gabungkan history dan result
+# Template path lengkap per id(route) (APIRoute tidak hashable). Route di scope["route"] adalah
+# route asli router-nya, yang path-nya belum memuat prefix dari include_router.
+_route_paths = {}
+
+def _include(router: APIRouter, prefix: str = "", **kwargs):
+    api_router.include_router(router, prefix=prefix, **kwargs)
+    for route in router.routes:
+        _route_paths[id(route)] = api_router.prefix + prefix + route.path
+
+_include(authentication.router, prefix="/authentication", tags=["Authentication"])
+_include(heroes.router, prefix="/heroes", tags=["Heroes"])
+_include(criterias.router, prefix="/criterias", tags=["Criterias"])
+_include(matches.router, prefix="/matches", tags=["Matches"])
+_include(recommendations.router, prefix="/recommendations", tags=["Recommendations"])
+_include(history.router, tags=["History"]) # Gabungkan history dan result
+_include(internal.router, prefix="/internal", tags=["Internal"])
 
 app.include_router(api_router)
 
+def _route_template(request: Request) -> str:
+    # Template path dari route yang cocok (diisi router selama call_next), mis. /api/v1/recommendations/{match_id},
+    # agar kardinalitas label tetap kecil
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    return _route_paths.get(id(route), route.path)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        labels = {"route": _route_template(request), "method": request.method}
+        metrics.observe("http_request_duration_seconds", labels, time.perf_counter() - start)
+        metrics.inc("http_requests_total", {**labels, "status": str(status_code)})
+
+@app.middleware("http")
+async def add_db_profile_headers(request: Request, call_next):
+    response = await call_next(request)
+    profile = getattr(request.state, "db_profile", None)
+    if profile is not None:
+        response.headers["X-DB-Queries"] = str(profile.queries)
+        response.headers["X-DB-Time"] = f"{profile.seconds * 1000:.2f}ms"
+    return response
+
+def collect_runtime_stats():
+    cache = ranking_cache_info()
+    yield "ahp_ranking_cache_hits", "Hit cache bobot AHP per ranking.", {}, cache.hits
+    yield "ahp_ranking_cache_misses", "Miss cache bobot AHP per ranking.", {}, cache.misses
+    for key, value in security.password_pool.stats().items():
+        yield f"password_pool_{key}", "Statistik pool hashing password.", {}, value
+    for label, stats in pool_stats.items():
+        for key, value in stats.snapshot().items():
+            if isinstance(value, (int, float)):
+                yield "db_pool_stat", "Statistik connection pool database.", {"engine": label, "stat": key}, value
+
+metrics.register_collector(collect_runtime_stats)
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/", tags=["Root"])
 def read_root():
     return {"message": "Welcome to Dota 2 AHP Recommendation API"}
\ No newline at end of file
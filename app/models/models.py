@@ -1,14 +1,14 @@
 import enum
 from sqlalchemy import (
     Column, Integer, String, DateTime, ForeignKey, Numeric, Date,
-    UniqueConstraint
+    Index, UniqueConstraint
 )
-from sqlalchemy.dialects.postgresql import JSONB, ENUM
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
+from app.db.types import JSONDocument, enum_column_type
 
-# Definisi Enum sesuai dengan yang ada di PostgreSQL
+# Definisi Enum sesuai dengan yang ada di PostgreSQL (dialek lain memakai CHECK constraint)
 class GameModeEnum(str, enum.Enum):
     all_pick = 'All Pick'
     turbo_mode = 'Turbo Mode'
@@ -63,14 +63,22 @@ class Matches(Base):
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     match_name = Column(String(255))
     match_date = Column(Date, nullable=False)
-    match_mode = Column(ENUM(GameModeEnum, name='game_mode', create_type=False), nullable=False)
+    match_mode = Column(enum_column_type(GameModeEnum, 'game_mode'), nullable=False)
     ally_team = Column(String(255))
-    allies = Column(JSONB, nullable=False)
+    allies = Column(JSONDocument, nullable=False)
     enemy_team = Column(String(255))
-    enemies = Column(JSONB, nullable=False)
+    enemies = Column(JSONDocument, nullable=False)
+    # Versi input rekomendasi (preferensi/alternatif); dasar ETag GET /recommendations/{match_id}
+    version = Column(Integer, nullable=False, default=1, server_default='1')
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Indeks untuk keyset pagination riwayat: (user, tanggal, id) dan varian dengan filter mode
+    __table_args__ = (
+        Index('ix_matches_user_date_id', 'user_id', 'match_date', 'id'),
+        Index('ix_matches_user_mode_date_id', 'user_id', 'match_mode', 'match_date', 'id'),
+    )
+
     user = relationship("Users", back_populates="matches")
     rankings = relationship("Rankings", back_populates="match")
     alternatives = relationship("Alternatives", back_populates="match")
@@ -159,11 +167,31 @@ class Histories(Base):
     id = Column(Integer, primary_key=True, index=True)
     match_id = Column(Integer, ForeignKey('matches.id'), nullable=False, unique=True)
     hero_id = Column(Integer, ForeignKey('heroes.id'), nullable=False)
-    match_result = Column(ENUM(ResultBattleEnum, name='result_battle', create_type=False), nullable=False)
+    match_result = Column(enum_column_type(ResultBattleEnum, 'result_battle'), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
-    __table_args__ = (UniqueConstraint('match_id', 'hero_id', name='_match_hero_history_uc'),)
+    __table_args__ = (
+        UniqueConstraint('match_id', 'hero_id', name='_match_hero_history_uc'),
+        Index('ix_histories_hero_match', 'hero_id', 'match_id'),
+    )
 
     match = relationship("Matches", back_populates="history")
-    hero = relationship("Heroes")
\ No newline at end of file
+    hero = relationship("Heroes")
+
+class HeroStats(Base):
+    __tablename__ = 'hero_stats'
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    hero_id = Column(Integer, ForeignKey('heroes.id'), nullable=False)
+    match_mode = Column(enum_column_type(GameModeEnum, 'game_mode'), nullable=False)
+    wins = Column(Integer, nullable=False, default=0, server_default='0')
+    losses = Column(Integer, nullable=False, default=0, server_default='0')
+    draws = Column(Integer, nullable=False, default=0, server_default='0')
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Counter per (user, hero, mode), diperbarui dalam transaksi yang sama dengan Histories
+    __table_args__ = (UniqueConstraint('user_id', 'hero_id', 'match_mode', name='_user_hero_mode_uc'),)
+
+    hero = relationship("Heroes")
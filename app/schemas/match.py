@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import date
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.models.models import GameModeEnum, ResultBattleEnum
 
 class MatchCreate(BaseModel):
@@ -21,6 +21,11 @@ class ResultCreate(BaseModel):
     heroId: int
     result: ResultBattleEnum
 
+class MatchImportRecord(MatchCreate):
+    # Satu baris NDJSON import: data match ditambah hero yang dipilih dan hasilnya (opsional, berpasangan)
+    heroId: Optional[int] = None
+    result: Optional[ResultBattleEnum] = None
+
 class HistoryHero(BaseModel):
     heroName: str
     heroAttribute: str
@@ -39,4 +44,19 @@ class MatchHistory(BaseModel):
 
 class HistoryResponse(BaseModel):
     status: str
-    matches: List[MatchHistory]
\ No newline at end of file
+    matches: List[MatchHistory]
+    nextCursor: Optional[str] = None
+
+class HeroStat(BaseModel):
+    heroId: int
+    heroName: str
+    matchMode: GameModeEnum
+    matches: int
+    wins: int
+    losses: int
+    draws: int
+    winRate: float
+
+class HeroStatsResponse(BaseModel):
+    status: str
+    stats: List[HeroStat]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, conlist
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 # --- Preferences Schemas ---
 class SubCriteriaPreferences(BaseModel):
@@ -74,5 +74,34 @@ class RecommendationResponse(BaseModel):
     status: str
     recommendations: List[RecommendationHero]
 
+# --- Sensitivity Analysis Schemas ---
+class SensitivityHero(BaseModel):
+    heroId: int
+    heroName: str
+    finalScore: float
+    baseRank: int
+    meanRank: float
+    # Indeks 0 = peringkat 1; nilai adalah proporsi sampel
+    rankFrequencies: List[float]
+
+class SensitivityResponse(BaseModel):
+    status: str
+    samples: int
+    requestedSamples: int
+    truncated: bool
+    elapsedMs: float
+    heroes: List[SensitivityHero]
+
+# --- Batch Recommendation Schemas ---
+class BatchRecommendationRequest(BaseModel):
+    matchIds: List[int] = Field(..., min_items=1)
+
+class BatchRecommendationItem(BaseModel):
+    # Satu baris NDJSON per match; status "error" membawa detail dan tanpa rekomendasi
+    matchId: int
+    status: str
+    recommendations: Optional[List[RecommendationHero]] = None
+    detail: Optional[str] = None
+
 class StatusResponse(BaseModel):
     status: str
\ No newline at end of file
@@ -6,4 +6,8 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+
+class Principal(BaseModel):
+    id: int
+    username: str
\ No newline at end of file
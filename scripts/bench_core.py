@@ -0,0 +1,214 @@
+# File: scripts/bench_core.py
+#
+# Micro-benchmark untuk inti perhitungan (tanpa database):
+#   - AHP: pembentukan matriks, eigen solve, dan CR untuk n = 2..15
+#   - Perhitungan bobot sembilan grup preferensi seperti pada submit_preferences
+#   - Scoring hero (ScoreMatrix + ranking) untuk 5, 50, dan seluruh hero
+#
+# Setiap benchmark melaporkan ops/detik dan alokasi memori (tracemalloc) per operasi.
+#
+# Cara menjalankan script ini (dari direktori root proyek):
+#   python -m scripts.bench_core --save-baseline     # simpan baseline di mesin ini
+#   python -m scripts.bench_core                     # bandingkan dengan baseline
+#   python -m scripts.bench_core --threshold 0.2 --filter ahp_eigen
+#
+# Exit code 1 jika ada benchmark yang throughput-nya turun lebih dari --threshold
+# dibandingkan baseline, dan 2 jika file baseline belum ada. Baseline bergantung pada
+# mesin, jadi tidak di-commit: simpan di mesin (atau runner CI) yang sama.
+#
+# Di CI baseline dibuat dari commit dasar di job yang sama, tepat sebelum perbandingan,
+# sehingga kedua angka berasal dari runner yang sama:
+#   git checkout <commit dasar>
+#   python -m scripts.bench_core --save-baseline --baseline /tmp/bench_core_baseline.json
+#   git checkout <commit PR>
+#   python -m scripts.bench_core --baseline /tmp/bench_core_baseline.json --threshold 0.25
+#
+# --threshold adalah toleransi penurunan ops/detik relatif terhadap baseline (0.15 = 15%).
+# Di mesin sendiri yang tenang 0.15 cukup; runner CI bersama lebih bising, jadi gunakan
+# 0.25 atau lebih. Benchmark yang belum ada di baseline hanya dilaporkan, tidak dibandingkan.
+
+import sys
+import os
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from decimal import Decimal
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from app.core.ahp import (
+    AHPProcessor, _consistency_ratio, _importance_matrix, _solve_eig, clear_ranking_cache, ranking_weights,
+)
+from app.core.scoring import ScoreMatrix
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "bench_core_baseline.json")
+
+# Struktur kriteria sesuai skema preferensi: 8 kriteria utama, masing-masing dengan sub-kriteria
+SUB_CRITERIA_SIZES = {"PA": 5, "GP": 4, "RSP": 6, "TCB": 4, "HSC": 3, "DHC": 3, "ELW": 4, "IKT": 3}
+# Jumlah hero di Dota 2 (perkiraan) untuk skenario "seluruh hero"
+ALL_HEROES = 126
+
+
+def make_preferences(seed: int = 0):
+    """
+    Ranking kriteria utama dan sub-kriteria sintetis dengan ID yang mengikuti urutan seed data.
+    """
+    rng = random.Random(seed)
+    main_ids = list(range(2, 2 + len(SUB_CRITERIA_SIZES)))
+    next_id = main_ids[-1] + 1
+    groups = {}
+    for parent_id, size in zip(main_ids, SUB_CRITERIA_SIZES.values()):
+        sub_ids = list(range(next_id, next_id + size))
+        next_id += size
+        rng.shuffle(sub_ids)
+        groups[parent_id] = sub_ids
+    rng.shuffle(main_ids)
+    return main_ids, groups
+
+
+def compute_preferences(main_ranks, groups):
+    # Sama dengan fase 1 submit_preferences: bobot lokal per grup dikali bobot global parent
+    main_weights, _ = ranking_weights(main_ranks)
+    weight_rows = {}
+    for crit_id, weight in main_weights.items():
+        weight_rows[crit_id] = Decimal(weight)
+    for parent_id, rankings in groups.items():
+        local_weights, _ = ranking_weights(rankings)
+        parent_global_weight = main_weights.get(parent_id, 0)
+        for crit_id, local_weight in local_weights.items():
+            weight_rows[crit_id] = Decimal(local_weight) * Decimal(parent_global_weight)
+    return weight_rows
+
+
+def make_scoring_input(num_heroes: int, seed: int = 0):
+    rng = random.Random(seed)
+    main_ranks, groups = make_preferences(seed)
+    weight_rows = compute_preferences(main_ranks, groups)
+    sub_ids = [crit_id for rankings in groups.values() for crit_id in rankings]
+    weights = {crit_id: weight_rows[crit_id] for crit_id in sub_ids}
+    alternatives = [
+        (hero_id, crit_id, rng.randint(1, 5))
+        for hero_id in range(1, num_heroes + 1)
+        for crit_id in sub_ids
+    ]
+    return alternatives, weights
+
+
+def build_benchmarks():
+    benchmarks = {}
+    for n in range(2, 16):
+        matrix = _importance_matrix(n)
+        _, lambda_max, _ = _solve_eig(matrix, 1e-10, 100)
+        rankings = list(range(n))
+        benchmarks[f"ahp_matrix_n{n}"] = lambda n=n: _importance_matrix(n)
+        benchmarks[f"ahp_eigen_n{n}"] = lambda m=matrix: _solve_eig(m, 1e-10, 100)
+        benchmarks[f"ahp_cr_n{n}"] = lambda lam=lambda_max, n=n: _consistency_ratio(lam, n)
+        benchmarks[f"ahp_processor_n{n}"] = lambda r=rankings: AHPProcessor(r)
+
+    main_ranks, groups = make_preferences()
+
+    def preferences_cold():
+        clear_ranking_cache()
+        compute_preferences(main_ranks, groups)
+
+    benchmarks["preferences_nine_groups_cold"] = preferences_cold
+    benchmarks["preferences_nine_groups_warm"] = lambda: compute_preferences(main_ranks, groups)
+
+    for label, num_heroes in (("5", 5), ("50", 50), ("all", ALL_HEROES)):
+        alternatives, weights = make_scoring_input(num_heroes)
+        benchmarks[f"scoring_heroes_{label}"] = lambda a=alternatives, w=weights: ScoreMatrix(a, w).ranking()
+    return benchmarks
+
+
+def measure(fn, min_time: float, repeats: int):
+    """
+    Mengembalikan (ops/detik terbaik dari beberapa ulangan, byte teralokasi puncak per operasi).
+    """
+    # Kalibrasi jumlah loop agar satu ulangan berlangsung minimal min_time detik
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+
+    best = loops / elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = max(best, loops / (time.perf_counter() - start))
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark AHP dan scoring")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Path file baseline JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="Tulis hasil run ini sebagai baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Penurunan ops/detik maksimum (0.15 = 15%%)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Durasi minimum satu ulangan (detik)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--filter", default=None, help="Hanya jalankan benchmark yang namanya mengandung teks ini")
+    parser.add_argument("--json", dest="json_output", default=None, help="Simpan hasil run ini ke file JSON")
+    args = parser.parse_args()
+
+    baseline = {}
+    if not args.save_baseline:
+        # Tanpa baseline tidak ada yang bisa dibandingkan; gagal agar gate regresi tidak lolos diam-diam
+        if not os.path.exists(args.baseline):
+            print(f"Baseline {args.baseline} tidak ditemukan; jalankan dulu dengan --save-baseline di mesin ini.", file=sys.stderr)
+            sys.exit(2)
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<32} {'ops/s':>12} {'alloc KiB':>10} {'baseline':>12} {'delta':>8}")
+    for name, fn in build_benchmarks().items():
+        if args.filter and args.filter not in name:
+            continue
+        ops, peak = measure(fn, args.min_time, args.repeats)
+        results[name] = {"ops_per_sec": ops, "alloc_bytes": peak}
+
+        base = baseline.get(name)
+        base_text, delta_text = "-", "-"
+        if base:
+            delta = ops / base["ops_per_sec"] - 1
+            base_text, delta_text = f"{base['ops_per_sec']:.1f}", f"{delta:+.1%}"
+            if delta < -args.threshold:
+                regressions.append((name, delta))
+        print(f"{name:<32} {ops:>12.1f} {peak / 1024:>10.1f} {base_text:>12} {delta_text:>8}")
+
+    report = {"python": sys.version.split()[0], "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+    if args.json_output:
+        with open(args.json_output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline disimpan ke {args.baseline}")
+        return
+
+    if regressions:
+        print(f"\nRegresi melebihi {args.threshold:.0%}:")
+        for name, delta in regressions:
+            print(f"  {name}: {delta:+.1%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# File: scripts/bench_db.py
+#
+# Membandingkan throughput stack database sync (psycopg2 + threadpool) dengan
+# stack async (asyncpg + AsyncSession) pada tingkat konkurensi yang sama.
+#
+# Cara menjalankan script ini (dari direktori root proyek, database harus berisi data hero):
+#   python -m scripts.bench_db --concurrency 1 8 32 64 --duration 10
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.session import SyncSessionAdapter
+from app.models.models import Heroes
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+async def run_workers(open_session, concurrency: int, duration: float):
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            db = open_session()
+            try:
+                # Query representatif: lookup by primary key seperti pada cek kepemilikan match
+                await db.scalar(select(Heroes).where(Heroes.id == 1))
+            finally:
+                await db.close()
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, latencies
+
+
+async def bench(mode: str, concurrency: int, duration: float):
+    if mode == "sync":
+        engine = create_engine(settings.DATABASE_URL, pool_size=concurrency, max_overflow=0)
+        factory = sessionmaker(bind=engine, autoflush=False)
+        open_session = lambda: SyncSessionAdapter(factory())
+    else:
+        engine = create_async_engine(settings.ASYNC_DATABASE_URL, pool_size=concurrency, max_overflow=0)
+        factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        open_session = factory
+    try:
+        return await run_workers(open_session, concurrency, duration)
+    finally:
+        if mode == "sync":
+            engine.dispose()
+        else:
+            await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stack database sync vs async")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--duration", type=float, default=5.0, help="Detik per kombinasi mode/konkurensi")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'conc':>5} {'ops/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        for mode in args.modes:
+            ops, latencies = asyncio.run(bench(mode, concurrency, args.duration))
+            print(
+                f"{mode:<6} {concurrency:>5} {ops:>10.1f} "
+                f"{percentile(latencies, 50) * 1000:>8.2f} {percentile(latencies, 95) * 1000:>8.2f} "
+                f"{percentile(latencies, 99) * 1000:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# File: scripts/import_matches.py
+#
+# Import data pertandingan historis dari file NDJSON langsung ke database, memakai
+# logika yang sama dengan endpoint POST /api/v1/matches/import. Satu baris per match:
+#   {"matchName": "...", "matchDate": "2024-01-31", "matchMode": "All Pick",
+#    "allyTeam": "...", "allies": [1, 2, 3, 4], "enemyTeam": "...", "enemies": [5, 6, 7, 8, 9],
+#    "heroId": 10, "result": "Win"}
+# heroId dan result opsional; jika ada, history match tersebut ikut dibuat.
+#
+# Cara menjalankan script ini (dari direktori root proyek):
+#   python -m scripts.import_matches --username alice matches.ndjson
+#   cat matches.ndjson | python -m scripts.import_matches --username alice -
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from sqlalchemy import select
+
+from app.core.hero_catalog import hero_catalog
+from app.db import match_import
+from app.db.session import open_session
+from app.models.models import Users
+
+
+async def file_lines(path: str):
+    handle = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        for line in handle:
+            yield line
+    finally:
+        if handle is not sys.stdin.buffer:
+            handle.close()
+
+
+async def run(args) -> int:
+    db = open_session()
+    try:
+        user_id = await db.scalar(select(Users.id).where(Users.username == args.username))
+        if user_id is None:
+            print(f"Error: Username '{args.username}' tidak ditemukan.", file=sys.stderr)
+            return 2
+        await db.run_sync(hero_catalog.load)
+
+        summary = {}
+        async for event in match_import.import_matches(db, user_id, file_lines(args.path), hero_catalog, args.chunk_size):
+            if event["status"] == "error":
+                if not args.quiet:
+                    print(f"Baris {event['line']}: {event['detail']}", file=sys.stderr)
+            elif event["status"] == "progress":
+                print(f"{event['processed']} baris diproses, {event['imported']} diimpor, {event['errors']} error")
+            else:
+                summary = event
+        print(json.dumps(summary))
+        return 1 if summary.get("errors") else 0
+    finally:
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import match dan hasilnya dari NDJSON")
+    parser.add_argument("path", help="File NDJSON, atau '-' untuk stdin")
+    parser.add_argument("--username", required=True, help="Pemilik match yang diimpor")
+    parser.add_argument("--chunk-size", type=int, default=match_import.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--quiet", action="store_true", help="Jangan tampilkan error per baris")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# File: scripts/inmemory_app.py
+#
+# Menjalankan aplikasi FastAPI yang sebenarnya di atas database SQLite in-memory:
+# skema dibuat dari model, hero dan pohon kriteria di-seed, lalu request dikirim
+# lewat TestClient. Tidak memerlukan PostgreSQL, sehingga cocok untuk uji
+# end-to-end dan benchmark throughput yang cepat.
+#
+# Dipakai dari kode lain (fixture pytest ada di tests/conftest.py):
+#   from scripts.inmemory_app import inmemory_app, login
+#   with inmemory_app(num_heroes=126) as client:
+#       client.get("/api/v1/heroes", headers=login(client))
+#
+# Atau langsung dari terminal (dari direktori root proyek):
+#   python -m scripts.inmemory_app --iterations 50
+
+import sys
+import os
+import argparse
+import random
+import time
+from contextlib import contextmanager
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+# Aplikasi membaca Settings saat import; nilai ini hanya dipakai jika belum diset di environment
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "inmemory-secret")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.api.deps import token_cache
+from app.api.endpoints.recommendations import recommendation_cache
+from app.core.ahp import clear_ranking_cache
+from app.core.security import get_password_hash
+from app.db import profiler, session as db_session
+from app.db.base import Base
+from app.db.pool import InstrumentedQueuePool, instrument
+from app.main import app
+from app.models import models
+from app.schemas.recommendation import AlternativeScores, SubCriteriaPreferences
+
+MAIN_CRITERIA = ["PA", "GP", "RSP", "TCB", "HSC", "DHC", "ELW", "IKT"]
+# Urutan field SubCriteriaPreferences mengikuti urutan MAIN_CRITERIA
+SUB_CRITERIA_GROUPS = dict(zip(SubCriteriaPreferences.model_fields, MAIN_CRITERIA))
+SUB_CRITERIA_CODES = [field.alias for field in AlternativeScores.model_fields.values()]
+
+DEFAULT_USERNAME = "bench"
+DEFAULT_PASSWORD = "bench-password"
+
+
+def criteria_rows():
+    """
+    Pohon kriteria: goal MG, 8 kriteria utama, dan sub-kriteria sesuai AlternativeScores.
+    """
+    tree = [("MG", None)] + [(code, "MG") for code in MAIN_CRITERIA]
+    tree += [(code, code.split("-")[0]) for code in SUB_CRITERIA_CODES]
+    return [
+        dict(id=i, code=code, parent=parent, name=code, description=code, paraphrase=code, narration=code)
+        for i, (code, parent) in enumerate(tree, start=1)
+    ]
+
+
+def seed(db, num_heroes: int, users) -> None:
+    attributes = ["Strength", "Agility", "Intelligence", "Universal"]
+    db.add_all(
+        models.Heroes(
+            id=i, name=f"Hero {i:03d}", attribute=attributes[i % len(attributes)],
+            attack_type="Melee" if i % 2 else "Ranged", difficulty=str(i % 3 + 1), role1="Carry",
+        )
+        for i in range(1, num_heroes + 1)
+    )
+    db.add_all(models.Criterias(**row) for row in criteria_rows())
+    # Hash dihitung sekali; semua user sintetis memakai password yang sama
+    password_hash = get_password_hash(DEFAULT_PASSWORD)
+    db.add_all(
+        models.Users(username=username, password=password_hash, name=username, email=f"{username}@example.com")
+        for username in users
+    )
+    db.commit()
+
+
+def reset_caches() -> None:
+    """
+    Kosongkan cache tingkat proses; isinya merujuk id dari database sebelumnya yang bisa dipakai ulang.
+    """
+    recommendation_cache.clear()
+    token_cache.clear()
+    clear_ranking_cache()
+
+
+def create_inmemory_engine():
+    # Database in-memory hidup selama koneksinya hidup, jadi pool berisi tepat satu koneksi.
+    # Session yang berjalan bersamaan menunggu giliran di pool (SQLite memang hanya satu writer).
+    engine = create_engine(
+        "sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0,
+        connect_args={"check_same_thread": False},
+    )
+    # Statistik pool (termasuk waktu tunggu giliran koneksi) tampil di /internal/db-pool
+    instrument(engine, "inmemory")
+    # Listener profiler selalu dipasang; header X-DB-* hanya muncul jika DB_PROFILER aktif
+    profiler.instrument(engine)
+    return engine
+
+
+@contextmanager
+def inmemory_app(num_heroes: int = 126, users=(DEFAULT_USERNAME,)):
+    """
+    Siapkan database in-memory dan arahkan session aplikasi ke sana selama konteks aktif.
+    Menghasilkan TestClient yang startup-nya (pemuatan katalog hero dan kriteria) sudah berjalan.
+    """
+    engine = create_inmemory_engine()
+    Base.metadata.create_all(engine)
+    previous_bind = db_session.SessionLocal.kw.get("bind")
+    previous_async = db_session.AsyncSessionLocal
+    db_session.SessionLocal.configure(bind=engine)
+    # Mode async tidak dipakai: SQLite diakses lewat Session sync dan SyncSessionAdapter
+    db_session.AsyncSessionLocal = None
+    reset_caches()
+    try:
+        db = db_session.SessionLocal()
+        try:
+            seed(db, num_heroes, users)
+        finally:
+            db.close()
+        with TestClient(app) as client:
+            yield client
+    finally:
+        db_session.SessionLocal.configure(bind=previous_bind)
+        db_session.AsyncSessionLocal = previous_async
+        reset_caches()
+        engine.dispose()
+
+
+def login(client, username: str = DEFAULT_USERNAME, password: str = DEFAULT_PASSWORD):
+    response = client.post("/api/v1/authentication", data={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def preferences_payload(match_id: int, rng: random.Random):
+    main_ids = list(range(2, 2 + len(MAIN_CRITERIA)))
+    rng.shuffle(main_ids)
+    # Dengan skala Saaty yang disederhanakan, ranking 8 kriteria selalu ber-CR 0.12 dan ditolak API;
+    # 7 kriteria (CR 0.096) adalah ranking utama terpanjang yang lolos
+    main_ids = main_ids[:7]
+    by_code = {row["code"]: row["id"] for row in criteria_rows()}
+    sub_criteria = {}
+    for field, parent in SUB_CRITERIA_GROUPS.items():
+        ids = [by_code[code] for code in SUB_CRITERIA_CODES if code.startswith(parent + "-")]
+        rng.shuffle(ids)
+        sub_criteria[field] = ids
+    return {"matchId": match_id, "preferences": {"criteria": main_ids, "subCriteria": sub_criteria}}
+
+
+def alternatives_payload(match_id: int, hero_ids, rng: random.Random):
+    return {
+        "matchId": match_id,
+        "heroes": [
+            {"heroId": hero_id, "alternative": {code: rng.randint(1, 5) for code in SUB_CRITERIA_CODES}}
+            for hero_id in hero_ids
+        ],
+    }
+
+
+def run_flow(client, headers, num_heroes: int, rng: random.Random):
+    """
+    Satu alur lengkap: match -> preferensi -> alternatif -> rekomendasi -> hasil.
+    Mengembalikan daftar (nama langkah, status code, detik).
+    """
+    timings = []
+
+    def call(step, method, url, **kwargs):
+        start = time.perf_counter()
+        response = client.request(method, url, headers=headers, **kwargs)
+        timings.append((step, response.status_code, time.perf_counter() - start))
+        return response
+
+    heroes = rng.sample(range(1, num_heroes + 1), 14)
+    match = call("matches", "POST", "/api/v1/matches", json={
+        "matchName": "Synthetic", "matchDate": "2024-01-01", "matchMode": "All Pick",
+        "allyTeam": "Radiant", "allies": heroes[:4], "enemyTeam": "Dire", "enemies": heroes[4:9],
+    })
+    match_id = match.json()["matchId"]
+    call("preferences", "POST", "/api/v1/recommendations/preferences", json=preferences_payload(match_id, rng))
+    call("alternatives", "POST", "/api/v1/recommendations/alternatives", json=alternatives_payload(match_id, heroes[9:14], rng))
+    recommendation = call("recommendation", "GET", f"/api/v1/recommendations/{match_id}")
+    picked = recommendation.json()["recommendations"][0]["heroId"]
+    call("result", "POST", "/api/v1/result", json={"matchId": match_id, "heroId": picked, "result": "Win"})
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alur end-to-end di atas SQLite in-memory")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--heroes", type=int, default=126)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    per_step = {}
+    with inmemory_app(args.heroes) as client:
+        headers = login(client)
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            for step, status_code, seconds in run_flow(client, headers, args.heroes, rng):
+                if status_code >= 400:
+                    raise SystemExit(f"{step} gagal dengan status {status_code}")
+                per_step.setdefault(step, []).append(seconds)
+        elapsed = time.perf_counter() - started
+
+    print(f"{args.iterations} alur dalam {elapsed:.2f} detik ({args.iterations / elapsed:.1f} alur/detik)")
+    for step, samples in per_step.items():
+        print(f"  {step:<16} rata-rata {sum(samples) / len(samples) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# File: scripts/loadtest.py
+#
+# Load generator untuk alur draft lengkap:
+#   login -> POST /matches -> POST /recommendations/preferences -> POST /recommendations/alternatives
+#   -> GET /recommendations/{id} -> POST /result -> GET /history
+#
+# Sejumlah virtual user berjalan bersamaan, masing-masing login sekali lalu menjalankan
+# campuran alur (--mix) sampai --duration habis. Hasil: p50/p95/p99 dan jumlah error per
+# endpoint, serta file JSON (--output) untuk membandingkan konfigurasi (sync vs async,
+# cache aktif vs tidak, dst.).
+#
+# Cara menjalankan script ini (dari direktori root proyek):
+#   1. Buat user sintetis langsung di database (sekali saja):
+#        python -m scripts.loadtest --create-users 50
+#   2. Jalankan server, misalnya: uvicorn app.main:app --workers 4
+#   3. Jalankan load test:
+#        python -m scripts.loadtest --users 50 --duration 60 --mix full=3,draft=1,browse=2 \
+#            --label async-cache-on --output results/async-cache-on.json
+#
+# Tanpa PostgreSQL, gunakan --inmemory: aplikasi dijalankan in-process di atas SQLite in-memory.
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import random
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+import httpx
+
+from app.schemas.recommendation import AlternativeScores, SubCriteriaPreferences
+
+USER_PREFIX = "loadtest-"
+DEFAULT_PASSWORD = "loadtest-password"
+# Field SubCriteriaPreferences -> kode kriteria utama
+SUB_CRITERIA_PARENTS = dict(zip(SubCriteriaPreferences.model_fields, ["PA", "GP", "RSP", "TCB", "HSC", "DHC", "ELW", "IKT"]))
+# Semua field AlternativeScores wajib diisi, jadi payload selalu memakai daftar lengkap dari skema
+SCORE_CODES = [field.alias for field in AlternativeScores.model_fields.values()]
+# Ranking kriteria utama terpanjang yang masih lolos batas CR 0.1 (lihat scripts/inmemory_app.py)
+MAX_MAIN_RANKING = 7
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def parse_mix(text: str):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in FLOWS:
+            raise argparse.ArgumentTypeError(f"Unknown flow '{name}'. Available: {', '.join(FLOWS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Reference:
+    """
+    ID hero dan struktur kriteria yang diambil dari API sebelum load test dimulai.
+    """
+    def __init__(self, heroes_body, criterias_body):
+        self.hero_ids = [hero["id"] for hero in heroes_body["heroes"]]
+        self.main_ids = []
+        self.sub_ids = {}
+        for main in criterias_body["model"]["criterias"]:
+            self.main_ids.append(main["id"])
+            self.sub_ids[main["code"]] = [sub["id"] for sub in main["sub_criterias"]]
+
+    def preferences(self, match_id: int, rng: random.Random):
+        main_ids = rng.sample(self.main_ids, min(len(self.main_ids), MAX_MAIN_RANKING))
+        sub_criteria = {}
+        for field, parent in SUB_CRITERIA_PARENTS.items():
+            ids = list(self.sub_ids.get(parent, []))
+            rng.shuffle(ids)
+            sub_criteria[field] = ids
+        return {"matchId": match_id, "preferences": {"criteria": main_ids, "subCriteria": sub_criteria}}
+
+    def alternatives(self, match_id: int, hero_ids, rng: random.Random):
+        return {
+            "matchId": match_id,
+            "heroes": [
+                {"heroId": hero_id, "alternative": {code: rng.randint(1, 5) for code in SCORE_CODES}}
+                for hero_id in hero_ids
+            ],
+        }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.status_codes = {}
+        self.flows = {}
+
+    def record(self, endpoint: str, seconds: float, status) -> None:
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        codes = self.status_codes.setdefault(endpoint, {})
+        codes[str(status)] = codes.get(str(status), 0) + 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self):
+        return {
+            endpoint: {
+                "count": len(samples),
+                "errors": self.errors.get(endpoint, 0),
+                "statusCodes": self.status_codes[endpoint],
+                "meanMs": sum(samples) / len(samples) * 1000,
+                "p50Ms": percentile(samples, 50) * 1000,
+                "p95Ms": percentile(samples, 95) * 1000,
+                "p99Ms": percentile(samples, 99) * 1000,
+                "maxMs": max(samples) * 1000,
+            }
+            for endpoint, samples in self.latencies.items()
+        }
+
+
+class StepFailed(Exception):
+    pass
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, username: str, password: str, reference: Reference,
+                 recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.reference = reference
+        self.recorder = recorder
+        self.rng = rng
+        self.headers = {}
+        self.completed_matches = []
+
+    async def call(self, endpoint: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError as exc:
+            self.recorder.record(endpoint, time.perf_counter() - start, type(exc).__name__)
+            raise StepFailed(endpoint)
+        self.recorder.record(endpoint, time.perf_counter() - start, response.status_code)
+        if response.status_code >= 400:
+            raise StepFailed(endpoint)
+        return response
+
+    async def login(self):
+        response = await self.call(
+            "POST /authentication", "POST", "/api/v1/authentication",
+            data={"username": self.username, "password": self.password},
+        )
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def draft(self, submit_result: bool = False):
+        heroes = self.rng.sample(self.reference.hero_ids, 14)
+        response = await self.call("POST /matches", "POST", "/api/v1/matches", json={
+            "matchName": "Load test", "matchDate": time.strftime("%Y-%m-%d"),
+            "matchMode": self.rng.choice(["All Pick", "Turbo Mode", "Captain Mode", "Single Draft"]),
+            "allyTeam": "Radiant", "allies": heroes[:4], "enemyTeam": "Dire", "enemies": heroes[4:9],
+        })
+        match_id = response.json()["matchId"]
+        await self.call("POST /recommendations/preferences", "POST", "/api/v1/recommendations/preferences",
+                        json=self.reference.preferences(match_id, self.rng))
+        await self.call("POST /recommendations/alternatives", "POST", "/api/v1/recommendations/alternatives",
+                        json=self.reference.alternatives(match_id, heroes[9:14], self.rng))
+        response = await self.call("GET /recommendations/{match_id}", "GET", f"/api/v1/recommendations/{match_id}")
+        if submit_result:
+            picked = response.json()["recommendations"][0]["heroId"]
+            await self.call("POST /result", "POST", "/api/v1/result", json={
+                "matchId": match_id, "heroId": picked, "result": self.rng.choice(["Win", "Lose", "Draw"]),
+            })
+            self.completed_matches.append(match_id)
+            await self.call("GET /history", "GET", "/api/v1/history")
+
+    async def full(self):
+        await self.draft(submit_result=True)
+
+    async def browse(self):
+        await self.call("GET /heroes", "GET", "/api/v1/heroes")
+        await self.call("GET /criterias", "GET", "/api/v1/criterias")
+        await self.call("GET /history", "GET", "/api/v1/history")
+        if self.completed_matches:
+            match_id = self.rng.choice(self.completed_matches)
+            await self.call("GET /recommendations/{match_id}", "GET", f"/api/v1/recommendations/{match_id}")
+
+
+FLOWS = {
+    "full": VirtualUser.full,
+    "draft": VirtualUser.draft,
+    "browse": VirtualUser.browse,
+}
+
+
+async def fetch_reference(client: httpx.AsyncClient, username: str, password: str) -> Reference:
+    response = await client.post("/api/v1/authentication", data={"username": username, "password": password})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    heroes = await client.get("/api/v1/heroes", headers=headers)
+    criterias = await client.get("/api/v1/criterias", headers=headers)
+    heroes.raise_for_status()
+    criterias.raise_for_status()
+    return Reference(heroes.json(), criterias.json())
+
+
+async def run_load(client: httpx.AsyncClient, args, password: str):
+    usernames = [f"{USER_PREFIX}{i:04d}" for i in range(args.users)]
+    reference = await fetch_reference(client, usernames[0], password)
+    recorder = Recorder()
+    flow_names = list(args.mix)
+    flow_weights = [args.mix[name] for name in flow_names]
+    deadline = time.perf_counter() + args.ramp_up + args.duration
+
+    async def virtual_user(index: int):
+        rng = random.Random(args.seed * 100003 + index)
+        user = VirtualUser(client, usernames[index], password, reference, recorder, rng)
+        await asyncio.sleep(args.ramp_up * index / max(args.users, 1))
+        try:
+            await user.login()
+        except StepFailed:
+            return
+        while time.perf_counter() < deadline:
+            flow = rng.choices(flow_names, weights=flow_weights)[0]
+            outcome = "ok"
+            try:
+                await FLOWS[flow](user)
+            except StepFailed:
+                outcome = "failed"
+            counts = recorder.flows.setdefault(flow, {"ok": 0, "failed": 0})
+            counts[outcome] += 1
+            if args.think_time:
+                await asyncio.sleep(rng.uniform(0, 2 * args.think_time))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i) for i in range(args.users)))
+    return recorder, time.perf_counter() - started
+
+
+def create_users(count: int, password: str) -> None:
+    # Import di sini agar mode load test murni tidak membutuhkan koneksi database
+    from sqlalchemy import select
+    from app.core.security import get_password_hash
+    from app.db.session import SessionLocal
+    from app.models.models import Users
+
+    usernames = [f"{USER_PREFIX}{i:04d}" for i in range(count)]
+    db = SessionLocal()
+    try:
+        existing = set(db.scalars(select(Users.username).where(Users.username.in_(usernames))))
+        password_hash = get_password_hash(password)
+        db.add_all(
+            Users(username=username, password=password_hash, name=username, email=f"{username}@loadtest.invalid")
+            for username in usernames if username not in existing
+        )
+        db.commit()
+        print(f"{count - len(existing)} user dibuat, {len(existing)} sudah ada.")
+    finally:
+        db.close()
+
+
+async def run_remote(args):
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        return await run_load(client, args, args.password)
+
+
+def run_inmemory(args):
+    from scripts.inmemory_app import DEFAULT_PASSWORD as INMEMORY_PASSWORD, inmemory_app
+    from app.main import app
+
+    usernames = [f"{USER_PREFIX}{i:04d}" for i in range(args.users)]
+    with inmemory_app(args.heroes, users=usernames):
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://inmemory", timeout=args.timeout) as client:
+                return await run_load(client, args, INMEMORY_PASSWORD)
+        return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test alur draft lengkap")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10, help="Jumlah virtual user bersamaan")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durasi load test (detik), di luar ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Waktu untuk menyalakan semua virtual user (detik)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Jeda rata-rata antar alur per user (detik)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("full=3,draft=1,browse=2"),
+                        help="Bobot alur, mis. full=3,draft=1,browse=2")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default=None, help="Nama konfigurasi yang diuji, disimpan di output JSON")
+    parser.add_argument("--output", default=None, help="Tulis hasil ke file JSON")
+    parser.add_argument("--create-users", type=int, metavar="N", help="Buat N user sintetis di database lalu keluar")
+    parser.add_argument("--inmemory", action="store_true", help="Jalankan aplikasi in-process di atas SQLite in-memory")
+    parser.add_argument("--heroes", type=int, default=126, help="Jumlah hero sintetis untuk --inmemory")
+    args = parser.parse_args()
+
+    if args.create_users:
+        create_users(args.create_users, args.password)
+        return
+
+    recorder, elapsed = run_inmemory(args) if args.inmemory else asyncio.run(run_remote(args))
+    summary = recorder.summary()
+
+    print(f"{'endpoint':<36} {'count':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, stats in summary.items():
+        print(
+            f"{endpoint:<36} {stats['count']:>7} {stats['errors']:>7} {stats['p50Ms']:>8.2f} "
+            f"{stats['p95Ms']:>8.2f} {stats['p99Ms']:>8.2f}"
+        )
+    total = sum(stats["count"] for stats in summary.values())
+    print(f"\n{total} request dalam {elapsed:.1f} detik ({total / elapsed:.1f} req/detik); alur: {recorder.flows}")
+
+    if args.output:
+        report = {
+            "label": args.label,
+            "target": "inmemory" if args.inmemory else args.base_url,
+            "startedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {
+                "users": args.users, "duration": args.duration, "rampUp": args.ramp_up,
+                "thinkTime": args.think_time, "mix": args.mix, "seed": args.seed,
+            },
+            "elapsedSeconds": elapsed,
+            "requests": total,
+            "requestsPerSecond": total / elapsed if elapsed else 0.0,
+            "flows": recorder.flows,
+            "endpoints": summary,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
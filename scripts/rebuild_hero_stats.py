@@ -0,0 +1,56 @@
+# File: scripts/rebuild_hero_stats.py
+#
+# Menghitung ulang tabel hero_stats dari Histories x Matches, misalnya setelah migrasi
+# 0002 atau untuk memperbaiki counter. User diproses per potongan; setiap potongan
+# dihapus lalu diisi ulang dengan satu INSERT ... SELECT dan di-commit tersendiri.
+#
+# Cara menjalankan script ini (dari direktori root proyek):
+#   python -m scripts.rebuild_hero_stats                  # semua user
+#   python -m scripts.rebuild_hero_stats --username alice # satu user
+#   python -m scripts.rebuild_hero_stats --chunk-size 200
+
+import sys
+import os
+import argparse
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from sqlalchemy import select
+
+from app.db.hero_stats import rebuild_users
+from app.db.session import SessionLocal
+from app.models.models import Users
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hitung ulang statistik hero per user")
+    parser.add_argument("--username", default=None, help="Hanya hitung ulang user ini")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Jumlah user per transaksi")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        statement = select(Users.id).order_by(Users.id)
+        if args.username:
+            statement = statement.where(Users.username == args.username)
+        user_ids = db.scalars(statement).all()
+        if not user_ids:
+            print("Tidak ada user yang cocok.")
+            return
+
+        written = 0
+        for start in range(0, len(user_ids), args.chunk_size):
+            chunk = user_ids[start:start + args.chunk_size]
+            written += rebuild_users(db, chunk)
+            db.commit()
+            print(f"{min(start + args.chunk_size, len(user_ids))}/{len(user_ids)} user selesai, {written} baris statistik")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# Fixture pytest: aplikasi FastAPI yang sebenarnya di atas SQLite in-memory (lihat scripts/inmemory_app.py).
+# Setiap test mendapat database baru yang sudah di-seed hero, pohon kriteria, dan satu user.
+
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+import pytest
+
+# scripts.inmemory_app diimpor lebih dulu: modul ini mengisi DATABASE_URL/SECRET_KEY default sebelum Settings dibaca
+from scripts.inmemory_app import inmemory_app, login
+from app.core.config import settings
+
+NUM_HEROES = 30
+
+
+@pytest.fixture
+def client():
+    with inmemory_app(NUM_HEROES) as client:
+        yield client
+
+
+@pytest.fixture
+def auth_headers(client):
+    return login(client)
+
+
+@pytest.fixture
+def db_profiler(monkeypatch):
+    # Aktifkan header X-DB-Queries / X-DB-Time selama test
+    monkeypatch.setattr(settings, "DB_PROFILER", True)
@@ -0,0 +1,34 @@
+import json
+
+
+def import_matches(client, headers, count: int, start: int = 0):
+    lines = [
+        json.dumps({
+            "matchName": f"Match {i}", "matchDate": f"2024-01-{i % 28 + 1:02d}", "matchMode": "All Pick",
+            "allyTeam": "Radiant", "allies": [1, 2, 3, 4], "enemyTeam": "Dire", "enemies": [5, 6, 7, 8, 9],
+            "heroId": 10, "result": "Win",
+        })
+        for i in range(start, start + count)
+    ]
+    response = client.post("/api/v1/matches/import", headers=headers, content="\n".join(lines))
+    assert response.status_code == 200
+    done = json.loads(response.text.splitlines()[-1])
+    assert done["imported"] == count
+
+
+def history_query_count(client, headers, expected_matches: int) -> int:
+    response = client.get("/api/v1/history", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["matches"]) == expected_matches
+    return int(response.headers["X-DB-Queries"])
+
+
+def test_history_query_count_does_not_grow_with_matches(client, auth_headers, db_profiler):
+    import_matches(client, auth_headers, 1)
+    # Request pertama mengisi cache token dan katalog; yang diukur adalah request berikutnya
+    client.get("/api/v1/history", headers=auth_headers)
+    single = history_query_count(client, auth_headers, 1)
+    assert single > 0
+
+    import_matches(client, auth_headers, 24, start=1)
+    assert history_query_count(client, auth_headers, 25) == single